@@ -0,0 +1,43 @@
+"""Status log history index and lifecycle analytics rollup
+
+Revision ID: 3b8f0c6e1a27
+Revises: 7d4c1f8e2b60
+Create Date: 2026-10-18 15:02:41.338190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '3b8f0c6e1a27'
+down_revision = '7d4c1f8e2b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Har ticket ki history (timestamp, id) order mein; analytics ke LAG/ROW_NUMBER windows isi index se chalte hain.
+    op.create_index('ix_ticket_status_logs_ticket_id_timestamp_id', 'ticket_status_logs', ['ticket_id', 'timestamp', 'id'], unique=False)
+    op.create_table('ticket_lifecycle_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('admin_key', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'metric', 'admin_key', 'bucket')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Watermark 0 se: pehle analytics reads purani history batch by batch rollup mein le aayenge
+    # (ya senior admin ek baar POST /admins/analytics/rebuild chala de).
+    op.execute("INSERT INTO rollup_watermarks (name, last_id) VALUES ('ticket_lifecycle', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_table('ticket_lifecycle_rollups')
+    op.drop_index('ix_ticket_status_logs_ticket_id_timestamp_id', table_name='ticket_status_logs')
@@ -0,0 +1,26 @@
+"""Ticket keyset pagination indexes
+
+Revision ID: 4f1d2a9c7b31
+Revises: cb28574d9c07
+Create Date: 2026-10-18 10:12:31.480211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '4f1d2a9c7b31'
+down_revision = 'cb28574d9c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listing ab (created_at, id) pe keyset pagination karti hai. Admin aur user dono branches ke liye matching index.
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_user_id_created_at_id', 'tickets', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_user_id_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
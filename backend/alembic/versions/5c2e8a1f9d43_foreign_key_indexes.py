@@ -0,0 +1,29 @@
+"""Indexes for the remaining foreign keys
+
+Revision ID: 5c2e8a1f9d43
+Revises: 9e4d2b7a5c18
+Create Date: 2026-10-18 16:31:52.104877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5c2e8a1f9d43'
+down_revision = '9e4d2b7a5c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # tickets.user_id, tickets.assigned_admin_id aur ticket_status_logs.ticket_id pehle se composite indexes ke
+    # leading column hain (ix_tickets_user_id_created_at_id, ix_tickets_assigned_admin_id_status_created_at_id,
+    # ix_ticket_status_logs_ticket_id_timestamp_id). Alag single-column index sirf writes mehenge karta.
+    # Bache hue FKs: attachments ka ticket_id (har ticket detail/list ka selectinload) aur logs ka changed_by_admin_id.
+    op.create_index(op.f('ix_attachments_ticket_id'), 'attachments', ['ticket_id'], unique=False)
+    op.create_index(op.f('ix_ticket_status_logs_changed_by_admin_id'), 'ticket_status_logs', ['changed_by_admin_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ticket_status_logs_changed_by_admin_id'), table_name='ticket_status_logs')
+    op.drop_index(op.f('ix_attachments_ticket_id'), table_name='attachments')
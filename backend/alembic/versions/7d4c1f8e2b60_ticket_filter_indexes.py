@@ -0,0 +1,26 @@
+"""Composite indexes for ticket listing filters
+
+Revision ID: 7d4c1f8e2b60
+Revises: e2a9d4b6c813
+Create Date: 2026-10-18 13:05:17.602954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '7d4c1f8e2b60'
+down_revision = 'e2a9d4b6c813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listing filters (status / assignee) ke saath bhi (created_at, id) order index se hi mil jaye, sort na karna pade.
+    op.create_index('ix_tickets_status_created_at_id', 'tickets', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_assigned_admin_id_status_created_at_id', 'tickets', ['assigned_admin_id', 'status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_assigned_admin_id_status_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_status_created_at_id', table_name='tickets')
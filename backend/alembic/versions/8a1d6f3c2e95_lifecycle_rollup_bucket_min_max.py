@@ -0,0 +1,27 @@
+"""Observed min/max per lifecycle rollup bucket
+
+Revision ID: 8a1d6f3c2e95
+Revises: 5c2e8a1f9d43
+Create Date: 2026-10-18 18:12:07.526341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '8a1d6f3c2e95'
+down_revision = '5c2e8a1f9d43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable: purane rows ka min/max pata nahi. Unke liye percentiles bucket bounds pe rehte hain,
+    # jab tak senior admin POST /admins/analytics/rebuild na chala de.
+    op.add_column('ticket_lifecycle_rollups', sa.Column('min_seconds', sa.Float(), nullable=True))
+    op.add_column('ticket_lifecycle_rollups', sa.Column('max_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ticket_lifecycle_rollups', 'max_seconds')
+    op.drop_column('ticket_lifecycle_rollups', 'min_seconds')
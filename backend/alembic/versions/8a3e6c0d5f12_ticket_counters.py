@@ -0,0 +1,38 @@
+"""Materialized ticket counters for dashboard stats
+
+Revision ID: 8a3e6c0d5f12
+Revises: 4f1d2a9c7b31
+Create Date: 2026-10-18 11:02:54.913377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '8a3e6c0d5f12'
+down_revision = '4f1d2a9c7b31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # `ticketstatus` enum type initial migration mein ban chuka hai, dobara CREATE TYPE nahi karna.
+    ticket_status = postgresql.ENUM('PENDING', 'IN_PROGRESS', 'ON_HOLD', 'RESOLVED', name='ticketstatus', create_type=False)
+    op.create_table('ticket_counters',
+    sa.Column('admin_key', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('status', ticket_status, nullable=False),
+    sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('admin_key', 'status', 'shard')
+    )
+    # Existing tickets se counters seed kar rahe hain taaki enable karte hi numbers sahi hon.
+    op.execute(
+        "INSERT INTO ticket_counters (admin_key, status, shard, count) "
+        "SELECT COALESCE(assigned_admin_id, 0), status, 0, COUNT(*) FROM tickets "
+        "WHERE status IS NOT NULL GROUP BY COALESCE(assigned_admin_id, 0), status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_counters')
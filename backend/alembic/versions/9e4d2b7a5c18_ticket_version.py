@@ -0,0 +1,24 @@
+"""Ticket version column for optimistic concurrency
+
+Revision ID: 9e4d2b7a5c18
+Revises: 3b8f0c6e1a27
+Create Date: 2026-10-18 15:48:09.771204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '9e4d2b7a5c18'
+down_revision = '3b8f0c6e1a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # server_default se existing rows ko version 1 mil jata hai; Postgres 11+ pe ye table rewrite nahi karta.
+    op.add_column('tickets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tickets', 'version')
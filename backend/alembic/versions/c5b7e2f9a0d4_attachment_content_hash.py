@@ -0,0 +1,29 @@
+"""Content-addressed attachment store columns
+
+Revision ID: c5b7e2f9a0d4
+Revises: 8a3e6c0d5f12
+Create Date: 2026-10-18 11:47:05.126604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c5b7e2f9a0d4'
+down_revision = '8a3e6c0d5f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Purane attachments ke liye dono columns NULL rahenge. Wo apne legacy `uploads/ticket_{id}_{name}` path pe hi rahenge.
+    op.add_column('attachments', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('attachments', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    # Reference count = is hash wale rows ki ginti. Index se ye count aur GC lookup sasta rehta hai.
+    op.create_index(op.f('ix_attachments_content_hash'), 'attachments', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attachments_content_hash'), table_name='attachments')
+    op.drop_column('attachments', 'size_bytes')
+    op.drop_column('attachments', 'content_hash')
@@ -0,0 +1,34 @@
+"""Full-text search column and GIN index on ticket descriptions
+
+Revision ID: e2a9d4b6c813
+Revises: c5b7e2f9a0d4
+Create Date: 2026-10-18 12:31:40.274118
+
+"""
+from alembic import op
+
+
+revision = 'e2a9d4b6c813'
+down_revision = 'c5b7e2f9a0d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # tsvector/GIN sirf Postgres mein hai. SQLite pe search LIKE fallback se chalta hai, wahan kuch nahi karna.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Generated STORED column: Postgres khud description se vector banata hai, app ko kabhi likhna nahi padta.
+    # Config 'english' fixed rakha hai, query side (`ticket_search.SEARCH_CONFIG`) same hona chahiye warna index use nahi hoga.
+    op.execute(
+        "ALTER TABLE tickets ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(description, ''))) STORED"
+    )
+    op.execute("CREATE INDEX ix_tickets_search_vector ON tickets USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_tickets_search_vector")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector")
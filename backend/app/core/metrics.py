@@ -0,0 +1,221 @@
+import bisect  # Histogram bucket dhoondhne ke liye.
+import logging  # Slow query log ke liye.
+import threading  # Metrics multiple threads se update hote hain.
+import time  # Wall time aur query time measure karne ke liye.
+from contextvars import ContextVar  # Har request ke apne counters, threadpool/greenlet mein bhi same object milta hai.
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple  # Type hints.
+
+from sqlalchemy import event  # SQLAlchemy hooks (query timing, rows).
+from sqlalchemy.engine import Engine  # Engine class pe listen karne se saare engines (sync, async, replicas) cover ho jate hain.
+from sqlalchemy.orm import Session  # ORM rows count karne ke liye session event.
+
+from app.core.config import settings  # Slow query threshold.
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# Default latency buckets (seconds) - Prometheus client jaise.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Minimal Prometheus-style histogram with labels (cumulative buckets, _sum and _count)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        index = bisect.bisect_left(self.buckets, value)  # Pehla bucket jiska upper bound >= value.
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        for key, counts, total in sorted(series):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = ",".join(labels + ['le="%s"' % le])
+                yield f"{self.name}_bucket{{{bucket_labels}}} {cumulative}"
+            label_str = "{" + ",".join(labels) + "}" if labels else ""
+            yield f"{self.name}_sum{label_str} {total}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request wall time by route.", ["method", "route", "status"]
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ["method", "route"]
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ["method", "route"], buckets=COUNT_BUCKETS
+)
+REQUEST_DB_ROWS = Histogram(
+    "http_request_db_rows", "Rows loaded (ORM) or affected (DML) per request.", ["method", "route"], buckets=COUNT_BUCKETS
+)
+PHASE_DURATION = Histogram(
+    "app_phase_duration_seconds", "Time spent in expensive non-DB phases (bcrypt, file I/O).", ["phase"]
+)
+
+_HISTOGRAMS = [REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_ROWS, PHASE_DURATION]
+_collectors: List[Callable[[], Iterable[str]]] = []  # Extra gauges (pool, caches) jo render ke waqt padhe jate hain.
+
+
+class RequestStats:
+    """Mutable per-request counters; the same object is shared by the threadpool/greenlet running the handler."""
+    __slots__ = ("scope", "db_seconds", "queries", "rows")
+
+    def __init__(self, scope):
+        self.scope = scope  # Routing isi dict ko update karta hai, toh route label baad mein bhi nikal sakte hain.
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    """Record time spent in a named non-DB phase such as 'bcrypt' or 'file_io'."""
+    PHASE_DURATION.observe(seconds, phase)
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """Add a callable that yields extra exposition lines (gauges) at scrape time."""
+    _collectors.append(collector)
+
+
+def render_gauges(prefix: str, values: Dict, labels: Optional[Dict[str, str]] = None) -> Iterable[str]:
+    """Exposition lines for the numeric entries of a status dict (e.g. pool_status, cache stats)."""
+    label_str = ""
+    if labels:
+        label_str = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):  # Strings (pool_class wagaira) skip.
+            continue
+        yield f"# TYPE {prefix}_{key} gauge"
+        yield f"{prefix}_{key}{label_str} {value}"
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for histogram in _HISTOGRAMS:
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# --- SQLAlchemy hooks ---
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        # Start time per-execution context pe: error aaye to context ke saath hi chala jata hai, conn pe kuch leak nahi hota.
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_seconds += elapsed
+        stats.queries += 1
+        if not statement.lstrip()[:6].upper().startswith("SELECT") and cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount  # DML: affected rows driver batata hai. SELECT rows ORM event se gine jate hain.
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold is not None and elapsed * 1000 >= threshold:
+        slow_query_logger.warning(
+            "slow query %.1fms route=%s: %s",
+            elapsed * 1000,
+            route_label(stats.scope) if stats is not None else "-",
+            " ".join(statement.split())[:1000],  # Whitespace compress aur length limit, logs saaf rahein.
+        )
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def _loaded_as_persistent(session, instance):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.rows += 1  # Har ORM object jo DB se load hua.
+
+
+# --- ASGI middleware ---
+
+def route_label(scope) -> str:
+    """
+    Matched path template for the request, e.g. /api/v1/tickets/{ticket_id}.
+    Included routers only expose their own relative template, so the prefix is taken from the real path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return "unmatched"  # 404/redirects: raw URL label mein nahi dalte, warna cardinality phat jayegi.
+    depth = template.count("/")
+    prefix = scope.get("path", "").rsplit("/", depth)[0] if depth else ""
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording wall time, DB time, query count and rows per route.
+    The route label is the matched path template (e.g. /api/v1/tickets/{ticket_id}), never the raw URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_stats.set(stats)  # Is request ke andar chalne wala har query isi object mein count hoga.
+        status_holder = {"status": 500}
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = route_label(scope)  # Routing ke baad FastAPI matched route scope mein daal deta hai.
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, route, str(status_holder["status"]))
+            REQUEST_DB_DURATION.observe(stats.db_seconds, method, route)
+            REQUEST_DB_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_ROWS.observe(stats.rows, method, route)
+            _current_stats.reset(token)
@@ -0,0 +1,117 @@
+import threading  # Cache ko threadpool ke multiple workers se safely access karne ke liye lock.
+import time  # TTL expiry ke liye monotonic clock.
+from collections import OrderedDict  # LRU order maintain karne ke liye.
+from dataclasses import dataclass  # Lightweight principal snapshot ke liye.
+from typing import Dict, Optional, Tuple  # Type hints.
+
+from app.core.config import settings  # TTL aur size limits config se.
+from app.models.enums import AdminRole  # Admin role type hint ke liye.
+
+
+@dataclass
+class CachedPrincipal:
+    """
+    Detached snapshot of a User/Admin row, safe to share across requests and sessions.
+    Carries only the fields the routers read off `current_user`.
+    """
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_admin_user: bool  # Token type 'admin' tha ya 'user'.
+    role: Optional[AdminRole] = None  # Sirf admins ke liye. Regular user ke liye None.
+
+    @classmethod
+    def from_model(cls, obj, is_admin_user: bool) -> "CachedPrincipal":
+        # ORM object ko cache mein nahi rakhte kyunki wo kisi aur request ke session se bound hota hai
+        # aur commit ke baad expire ho jata hai. Plain values copy kar rahe hain.
+        return cls(
+            id=obj.id,
+            email=obj.email,
+            full_name=obj.full_name,
+            is_active=bool(obj.is_active),
+            is_admin_user=is_admin_user,
+            role=getattr(obj, "role", None),
+        )
+
+
+PrincipalKey = Tuple[str, str]  # (token type, sub) - e.g. ("admin", "admin@example.com").
+
+
+class PrincipalCache:
+    """In-process TTL + LRU cache of resolved principals keyed by (type, sub)."""
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds  # Entry kitni der valid rahegi. 0 matlab cache off.
+        self.max_size = max_size  # Isse zyada entries hui toh sabse purani (least recently used) hatayenge.
+        self._entries: "OrderedDict[PrincipalKey, Tuple[float, CachedPrincipal]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0  # Kitni baar DB query bachi.
+        self.misses = 0  # Kitni baar DB tak jana pada.
+        self.invalidations = 0  # Kitni entries explicitly hatayi gayi.
+
+    def get(self, key: PrincipalKey) -> Optional[CachedPrincipal]:
+        if self.ttl_seconds <= 0:  # Cache disabled hai.
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:  # Expired entry ko hata do, caller DB se fresh lega.
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)  # Recently used mark kiya (LRU).
+            self.hits += 1
+            return principal
+
+    def set(self, key: PrincipalKey, principal: CachedPrincipal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:  # Size limit cross hui toh LRU entry evict.
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_type: str, email: str) -> None:
+        """Drop one principal, e.g. after its is_active flag or role changed."""
+        with self._lock:
+            if self._entries.pop((user_type, email), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide singleton. Har worker process ka apna cache hota hai, isliye TTL chhota rakha hai:
+# doosre worker / CLI script ka change (role, is_active) yahan zyada se zyada TTL der se dikhta hai.
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
+
+
+def invalidate_principal(user_type: str, email: str) -> None:
+    """
+    Drop a principal from this process's cache after its is_active or role changed.
+    Other workers and processes are not reached; their entries expire within PRINCIPAL_CACHE_TTL_SECONDS,
+    which is the upper bound on how stale a principal can be.
+    """
+    principal_cache.invalidate(user_type, email)
@@ -1,8 +1,13 @@
+import asyncio  # Worker pool ke future ko await karne ke liye.
+import threading  # Pending jobs limit karne ke liye semaphore.
+import time  # bcrypt time measure karne ke liye.
+from concurrent.futures import ThreadPoolExecutor  # Password work ke liye alag bounded pool.
 from datetime import datetime, timedelta  # Time manipulation ke liye import. Token expiration set karne ke liye zaroori hai.
 from typing import Optional, Union, Any  # Type hints import kar rahe hain code clarity aur static analysis ke liye.
 from jose import jwt  # JWT creation aur validation library. JSON Web Tokens standard authentication mechanism ho gaya hai APIs ke liye.
 import bcrypt  # Password hashing library. Raw string matching safe nahi hota, bcrypt slow hashing use karta hai brute force se bachne ke liye.
 from app.core.config import settings  # Config settings import kar rahe hain (SECRET_KEY, ALGORITHM etc.).
+from app.core.metrics import observe_phase  # bcrypt time /metrics pe alag phase ke roop mein.
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Check if the password matches the hash."""
@@ -14,10 +19,53 @@ def get_password_hash(password: str) -> str:
     """Generate a bcrypt hash for the password."""
     # bcrypt.hashpw requires bytes and returns bytes
     pwd_bytes = password.encode('utf-8')  # String ko bytes mein convert kiya kyunki bcrypt bytes expect karta hai.
-    salt = bcrypt.gensalt()  # Random salt generate kiya. Har password ka unique salt hota hai taaki rainbow table attacks fail ho jayein.
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)  # Random salt generate kiya (configurable cost ke saath). Har password ka unique salt hota hai taaki rainbow table attacks fail ho jayein.
     hashed = bcrypt.hashpw(pwd_bytes, salt)  # Actual hashing process. Ye CPU intensive operation hai deliberately.
     return hashed.decode('utf-8')  # Result ko wapas string mein convert kiya DB mein store karne ke liye.
 
+# --- Password Worker Pool ---
+# bcrypt jaan-boojh kar slow hai. Login storm mein agar ye request threadpool mein chale toh ticket traffic starve ho jata hai.
+# Isliye password ka kaam ek chhote dedicated pool mein bhejte hain. bcrypt GIL release karta hai, toh threads kaafi hain.
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password worker pool and its queue are full."""
+
+_password_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Running + waiting jobs ki upper limit. Non-blocking acquire fail hua matlab pool saturated hai -> backpressure.
+_password_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_PENDING)
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        observe_phase("bcrypt", time.perf_counter() - started)  # Sirf actual hashing time, queue wait nahi.
+
+async def _run_in_password_pool(fn, *args):
+    if not _password_slots.acquire(blocking=False):  # Queue full hai, wait karne ke bajaye turant mana kar do.
+        raise PasswordHasherBusy()
+    try:
+        future = _password_pool.submit(_timed, fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())  # Job khatam (ya fail) hote hi slot wapas.
+    return await asyncio.wrap_future(future)  # Event loop free rehta hai jab tak bcrypt chal raha hai.
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` on the bounded password pool. Raises PasswordHasherBusy when saturated."""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` on the bounded password pool. Raises PasswordHasherBusy when saturated."""
+    return await _run_in_password_pool(get_password_hash, password)
+
+def shutdown_password_pool() -> None:
+    _password_pool.shutdown(wait=False)
+
 def create_access_token(subject: Union[str, Any], user_type: str, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT token.
@@ -0,0 +1,120 @@
+import threading  # Counters multiple threads/greenlets se update hote hain.
+import time  # Checkout wait time measure karne ke liye.
+from typing import Dict  # Type hints.
+
+from sqlalchemy import event, exc  # Naye connection ka event aur pool timeout error.
+from sqlalchemy.pool import QueuePool  # Default sync pool.
+from sqlalchemy.pool.impl import AsyncAdaptedQueuePool  # Async engine ka default pool.
+
+
+class PoolMetrics:
+    """Cumulative counters for one connection pool (checkouts, waits, overflow, timeouts)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0  # Kitni baar pool se connection nikala gaya.
+        self.connects = 0  # Kitne naye DB connections bane (pool + overflow).
+        self.overflow_events = 0  # Kitni baar pool_size se upar extra (overflow) connection banana pada.
+        self.timeouts = 0  # Kitni baar pool_timeout tak wait karke bhi connection nahi mila.
+        self.wait_seconds_total = 0.0  # Checkout mein kul kitna time gaya.
+        self.wait_seconds_max = 0.0  # Sabse lamba single wait.
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+    def record_connect(self, overflow: bool) -> None:
+        with self._lock:
+            self.connects += 1
+            if overflow:
+                self.overflow_events += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+NEW_CONNECTION_KEY = "pool_metrics_new"  # `connect` event is key ko connection_record.info mein set karta hai.
+
+
+def _mark_new_connection(dbapi_connection, connection_record) -> None:
+    connection_record.info[NEW_CONNECTION_KEY] = True  # Naya DBAPI connection bana; checkout pe connect() ise ginta hai.
+
+
+class _InstrumentedPoolMixin:
+    """
+    Pool metrics from public API only: wait time around `connect()`, new connections from the `connect` event.
+    `connect()` is what the engine calls per checkout and it never calls itself, so every checkout is timed once.
+    """
+    metrics: PoolMetrics
+
+    def __init__(self, *args, max_overflow: int = 10, timeout: float = 30.0, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, timeout=timeout, **kwargs)
+        self.metrics = PoolMetrics()
+        self.limits = {"max_overflow": max_overflow, "timeout_seconds": timeout}  # live_status ke liye apni copy.
+        if not event.contains(self, "connect", _mark_new_connection):  # recreate() purane pool ke listeners copy kar deta hai.
+            event.listen(self, "connect", _mark_new_connection)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:  # Pool exhausted: pool_size + max_overflow sab busy the.
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        if connection.info.pop(NEW_CONNECTION_KEY, False):
+            # overflow() -pool_size se shuru hota hai; 0 se upar matlab pool_size se zyada connections khule hain. Ek saath kai
+            # connections bante waqt ye ek-aadh extra bhi gin sakta hai (exact count ke liye private `_inc_overflow` chahiye tha).
+            self.metrics.record_connect(overflow=self.overflow() > 0)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics  # Pool dispose/recreate ho toh bhi counters continue rahein.
+        return pool
+
+    def live_status(self) -> Dict:
+        """Current pool occupancy plus cumulative counters."""
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.limits,
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> Dict:
+    """Live status of an engine's pool, or a short description for non-queue pools (e.g. SQLite :memory:)."""
+    pool = engine.pool
+    if hasattr(pool, "live_status"):
+        return pool.live_status()
+    return {"pool_class": type(pool).__name__, "status": pool.status()}
@@ -0,0 +1,226 @@
+import contextlib  # Export jaise callers ke liye session context manager.
+import hashlib  # Token ka stickiness key (raw token memory mein nahi rakhte).
+import logging  # Replica down / wapas aane ka log.
+import threading  # Health state aur stickiness map threads se update hote hain.
+import time  # Down marking aur stickiness expiry.
+from typing import Dict, Iterator, List, Optional  # Type hints.
+
+from fastapi import Request  # Stickiness ke liye Authorization header / cookie.
+from sqlalchemy import create_engine  # Har replica ka apna engine aur pool.
+from sqlalchemy.exc import DBAPIError  # Replica connect failure.
+from sqlalchemy.orm import Session, sessionmaker  # Replica connection pe session.
+
+from app.core.config import settings  # Replica URLs, stickiness window, retry delay.
+from app.db.session import SessionLocal, AsyncSessionLocal, async_driver_url, engine_options, get_db  # Primary fallback.
+
+logger = logging.getLogger("app.db.replicas")
+
+STICKY_COOKIE = "read_primary_until"  # Browser ke liye: multi-worker deploy mein bhi agla read primary pe.
+STICKY_MAX_KEYS = 10000  # In-process stickiness map ki limit.
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines, skipping ones that failed to connect in the last REPLICA_RETRY_SECONDS.
+    Health is learned from real checkouts, there is no background prober.
+    """
+
+    def __init__(self, engines: List):
+        self.engines = engines
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until: Dict[int, float] = {}  # Engine index -> kab tak skip.
+        self.fallbacks = 0  # Kitni baar koi replica nahi mila aur primary use hua.
+
+    def candidates(self) -> List:
+        """Healthy replicas in round-robin order (index, engine)."""
+        with self._lock:
+            now = time.monotonic()
+            start = self._next
+            self._next = (self._next + 1) % len(self.engines) if self.engines else 0
+            order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+            return [(index, self.engines[index]) for index in order if self._down_until.get(index, 0) <= now]
+
+    def mark_down(self, index: int, exc: Exception) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        logger.warning("replica %s unavailable, using other replicas/primary for %ss: %s",
+                       index, settings.REPLICA_RETRY_SECONDS, exc)
+
+    def mark_up(self, index: int) -> None:
+        if index in self._down_until:  # Lock ke bina sasta check; zyada tar replicas healthy hote hain.
+            with self._lock:
+                if self._down_until.pop(index, None) is not None:
+                    logger.info("replica %s is back", index)
+
+    def note_fallback(self) -> None:
+        """Count a read sent to the primary because every configured replica is down."""
+        if not self.engines:  # Replicas hi nahi hain toh primary normal path hai, outage nahi.
+            return
+        with self._lock:
+            self.fallbacks += 1
+
+    def status(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            down = sum(1 for until in self._down_until.values() if until > now)
+            return {"replicas": len(self.engines), "replicas_up": len(self.engines) - down, "primary_fallbacks": self.fallbacks}
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in (settings.DATABASE_REPLICA_URLS or "").split(",") if url.strip()]
+
+
+replica_set = ReplicaSet([create_engine(url, **engine_options(url)) for url in _replica_urls()])
+async_replica_set: Optional[ReplicaSet] = None
+if settings.ASYNC_DB and replica_set.engines:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async_replica_set = ReplicaSet([
+        create_async_engine(async_driver_url(url), **engine_options(async_driver_url(url), is_async=True))
+        for url in _replica_urls()
+    ])
+
+# Replica connection pe bane sessions. Config SessionLocal jaisa hi, sirf bind har baar connection hota hai.
+ReplicaSession = sessionmaker(autocommit=False, autoflush=False)
+
+
+# --- Read-your-writes stickiness ---
+
+_sticky_lock = threading.Lock()
+_sticky_until: Dict[str, float] = {}  # Token hash -> is time (epoch) tak reads primary se.
+
+
+def _client_key(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def note_write(authorization: Optional[str]) -> float:
+    """Pin this client's reads to the primary for REPLICA_READ_AFTER_WRITE_SECONDS. Returns the expiry (epoch)."""
+    until = time.time() + settings.REPLICA_READ_AFTER_WRITE_SECONDS
+    key = _client_key(authorization)
+    if key is not None:
+        with _sticky_lock:
+            if len(_sticky_until) >= STICKY_MAX_KEYS:  # Expired keys saaf, phir bhi bhara hai toh sabse purana hatao.
+                now = time.time()
+                for stale in [k for k, v in _sticky_until.items() if v <= now]:
+                    del _sticky_until[stale]
+                if len(_sticky_until) >= STICKY_MAX_KEYS:
+                    del _sticky_until[min(_sticky_until, key=_sticky_until.get)]
+            _sticky_until[key] = until
+    return until
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    """True while the client is inside the read-after-write window (same worker map, or the cookie)."""
+    now = time.time()
+    key = _client_key(request.headers.get("authorization"))
+    if key is not None and _sticky_until.get(key, 0) > now:
+        return True
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > now
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: a successful non-GET request pins that client's reads to the primary for a few
+    seconds, by token on this worker and by cookie for browsers hitting other workers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                authorization = None
+                for name, value in scope.get("headers", []):
+                    if name == b"authorization":
+                        authorization = value.decode("latin-1")
+                        break
+                until = note_write(authorization)
+                cookie = f"{STICKY_COOKIE}={until:.0f}; Max-Age={settings.REPLICA_READ_AFTER_WRITE_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# --- Sessions ---
+
+def _connect_replica():
+    if not replica_set.engines:  # Export jaise callers replicas ke bina bhi yahan aate hain.
+        return None
+    for index, replica in replica_set.candidates():
+        try:
+            connection = replica.connect()  # Pehle hi checkout: replica down hai toh yahin pata chale, query ke beech nahi.
+        except DBAPIError as exc:
+            replica_set.mark_down(index, exc)
+            continue
+        replica_set.mark_up(index)
+        return connection
+    replica_set.note_fallback()
+    return None
+
+
+@contextlib.contextmanager
+def read_session(prefer_primary: bool = False) -> Iterator[Session]:
+    """Sync session on a healthy replica, or on the primary when none is configured/reachable."""
+    connection = None if prefer_primary else _connect_replica()
+    db = ReplicaSession(bind=connection) if connection is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        if connection is not None:
+            connection.close()  # Replica pool mein wapas.
+
+
+async def _connect_async_replica():
+    for index, replica in async_replica_set.candidates():
+        try:
+            connection = await replica.connect()
+        except DBAPIError as exc:
+            async_replica_set.mark_down(index, exc)
+            continue
+        async_replica_set.mark_up(index)
+        return connection
+    async_replica_set.note_fallback()
+    return None
+
+
+# Dependency for read-only endpoints. Replicas nahi hain toh ye `get_db` hi hai: FastAPI auth wala session reuse karta hai.
+if not replica_set.engines:
+    get_read_db = get_db
+elif settings.ASYNC_DB:
+    async def get_read_db(request: Request):
+        connection = None if reads_pinned_to_primary(request) else await _connect_async_replica()
+        if connection is not None:
+            db = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+        else:
+            db = AsyncSessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+            if connection is not None:
+                await connection.close()
+else:
+    def get_read_db(request: Request):
+        with read_session(prefer_primary=reads_pinned_to_primary(request)) as db:
+            yield db
+
+
+def status() -> Dict:
+    """Replica health for metrics / admin endpoints."""
+    active = async_replica_set if async_replica_set is not None else replica_set
+    return active.status()
@@ -1,10 +1,37 @@
+import functools  # Endpoint decorator ka signature preserve karne ke liye.
+from typing import Any, Callable  # Type hints.
+
+from fastapi.concurrency import run_in_threadpool  # Sync mode mein DB kaam threadpool mein chalane ke liye.
 from sqlalchemy import create_engine  # `create_engine` import kiya jo database connection ka entry point hai. Ye connection pool manage karta hai raw connection ke mukable.
-from sqlalchemy.orm import sessionmaker, declarative_base  # `sessionmaker` factory hai sessions banane ke liye, aur `declarative_base` models ka base class hai.
+from sqlalchemy.orm import sessionmaker, declarative_base, Session  # `sessionmaker` factory hai sessions banane ke liye, aur `declarative_base` models ka base class hai.
+from app.db.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool  # Metrics wale pool classes.
 from app.core.config import settings  # Settings import kiye taaki hardcoded credentials use na karein. Config se DB URL lena best practice hai.
 
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool and connection options for `create_engine` / `create_async_engine` from Settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return options  # In-memory SQLite single connection pool use karta hai, wahan sizing ka matlab nahi.
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,  # Wait time/overflow metrics ke liye.
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.startswith("postgres"):
+        # Har connection pe server side `statement_timeout`. Ek runaway query poora pool hold na kar sake.
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}  # asyncpg style.
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}  # libpq/psycopg2 style.
+    return options
+
 # Create the SQLAlchemy engine using the database URL from settings
 # Engine start kar rahe hain settings se URL lekar. `connect_args={"check_same_thread": False}` sirf SQLite ke liye chahiye hota hai, Postgres ke liye nahi.
-engine = create_engine(settings.DATABASE_URL)  # Engine initialize kiya. Ye turant connect nahi karta, lazy connection hota hai (jab pehli query aayegi tab connect hoga).
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))  # Engine initialize kiya. Ye turant connect nahi karta, lazy connection hota hai (jab pehli query aayegi tab connect hoga).
 
 # Create a scoped session factory
 # `autocommit=False` isliye rakha taaki hum manually `commit()` karein jab transaction pura ho, data integrity ke liye.
@@ -15,11 +42,84 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)  # S
 # Saare ORM models is `Base` class ko inherit karenge taaki SQLAlchemy unhe track kar sake.
 Base = declarative_base()  # Registry maintain karne ke liye base class.
 
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver."""
+    if settings.ASYNC_DATABASE_URL:  # Explicit URL diya hai toh wahi.
+        return settings.ASYNC_DATABASE_URL
+    return async_driver_url(url)
+
+
+def async_driver_url(url: str) -> str:
+    """Swap the driver in a sync URL for its async counterpart (replica URLs use this directly)."""
+    scheme, sep, rest = url.partition("://")
+    driver_map = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "postgres": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }
+    return driver_map.get(scheme, scheme) + sep + rest
+
+
+# Async mode (opt-in). Sync engine upar waisa hi rehta hai: startup hook, scripts aur Alembic usi ko use karte hain.
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    _async_url = async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+    # `expire_on_commit=False` zaroori hai: commit ke baad response serialize hote waqt lazy refresh async mein possible nahi.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 # Dependency to get a DB session
 # Ye dependency injection ke liye function hai jo FastAPI routes mein use hoga.
-def get_db():
-    db = SessionLocal()  # Naya session start kiya. Har request ke liye isolated session hona chahiye concurrency safe rakhne ke liye.
-    try:
-        yield db  # Session ko route ko pass kiya. `yield` use kiya taaki response bhejne ke baad hum wapas control le sakein (teardown ke liye).
-    finally:
-        db.close()  # Request khatam hote hi session close kiya taaki connection pool mein connection wapas chala jaye. Memory leak se bachne ke liye ye critical hai.
+# Sync mode mein `Session` milta hai, async mode mein `AsyncSession`. Routes dono ko `run_db` / `db_endpoint` se handle karte hain.
+if settings.ASYNC_DB:
+    async def get_db():
+        async with AsyncSessionLocal() as db:  # Request khatam hote hi session close, connection pool mein wapas.
+            yield db
+else:
+    def get_db():
+        db = SessionLocal()  # Naya session start kiya. Har request ke liye isolated session hona chahiye concurrency safe rakhne ke liye.
+        try:
+            yield db  # Session ko route ko pass kiya. `yield` use kiya taaki response bhejne ke baad hum wapas control le sakein (teardown ke liye).
+        finally:
+            db.close()  # Request khatam hote hi session close kiya taaki connection pool mein connection wapas chala jaye. Memory leak se bachne ke liye ye critical hai.
+
+
+async def run_db(db, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run `fn(session, *args, **kwargs)` with a plain sync `Session`, whichever mode is active.
+    - Async mode: `AsyncSession.run_sync` drives the ORM over the async driver on the event loop (no threadpool slot).
+    - Sync mode: the function runs in the threadpool, exactly like a plain `def` endpoint.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    return await db.run_sync(fn, *args, **kwargs)
+
+
+def db_endpoint(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorator for endpoints written against a sync `Session` named `db`.
+    Exposes them to FastAPI as `async def` and runs the body through `run_db`, so the same
+    handler works in both sync and async DB mode. The original signature is kept for FastAPI.
+    """
+    @functools.wraps(fn)  # `__wrapped__` ke through FastAPI original parameters aur dependencies padhta hai.
+    async def endpoint(*args, **kwargs):
+        db = kwargs.pop("db")
+        return await run_db(db, lambda session: fn(*args, db=session, **kwargs))
+    return endpoint
+
+
+async def release_db(db) -> None:
+    """
+    Close the request session early, returning its connection to the pool.
+    For long-lived responses (event streams) that only need the DB for authentication.
+    """
+    if isinstance(db, Session):
+        await run_in_threadpool(db.close)
+    else:
+        await db.close()
@@ -1,8 +1,12 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+import asyncio
+import os
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware # Import CORS
 from app.routers import auth, tickets, admins, users
 from app.core.config import settings
+from app.core import security, metrics
+from app.db import replicas
 
 # Initialize FastAPI App
 app = FastAPI(
@@ -26,9 +30,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount Uploads directory to serve files
-# Warning: In production, use Nginx/S3. This is for dev/demo.
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Read replicas configured hain toh client ke apne write ke baad uske reads kuch seconds primary pe (read-your-writes).
+if replicas.replica_set.engines:
+    app.add_middleware(replicas.ReadYourWritesMiddleware)
+
+# Har request ka wall time, DB time, query count aur rows route-wise record hota hai. Outermost rakha hai taaki CORS bhi count ho.
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    def _pool_gauges():
+        from app.db.session import engine, async_engine
+        from app.db.pool_metrics import pool_status
+        yield from metrics.render_gauges("db_pool", pool_status(engine), {"engine": "sync"})
+        if async_engine is not None:
+            yield from metrics.render_gauges("db_pool", pool_status(async_engine.sync_engine), {"engine": "async"})
+
+    def _principal_cache_gauges():
+        from app.core.principal_cache import principal_cache
+        yield from metrics.render_gauges("principal_cache", principal_cache.stats())
+
+    def _replica_gauges():
+        if replicas.replica_set.engines:
+            yield from metrics.render_gauges("db", replicas.status())
+
+    metrics.register_collector(_pool_gauges)
+    metrics.register_collector(_replica_gauges)
+    metrics.register_collector(_principal_cache_gauges)
+
+    # Prometheus scrape endpoint. API prefix ke bahar hai, jaise scrapers expect karte hain; network level pe restrict karo.
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Password pool full ho toh 429 bhejo. Client thodi der baad retry kare, baaki traffic chalta rahe.
+@app.exception_handler(security.PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: security.PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many password checks in progress. Please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+# Uploads ab public StaticFiles mount se serve nahi hote. Download `GET /tickets/{id}/attachments/{att_id}` se hota hai,
+# jahan access check, ETag aur Range support hai.
 
 # Include Routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Auth"])
@@ -39,9 +83,11 @@ app.include_router(admins.router, prefix=f"{settings.API_V1_STR}/admins", tags=[
 @app.on_event("startup")
 def startup_event():
     # Create the upload directory if it doesn't exist
-    import os
-    if not os.path.exists("uploads"):
-        os.makedirs("uploads")
+    if not os.path.exists(settings.UPLOAD_DIR):
+        os.makedirs(settings.UPLOAD_DIR)
+    # Crash hue workers ki bachi hui temp upload files saaf kar rahe hain.
+    from app.services import file_service
+    file_service.cleanup_stale_temp_files()
     
     # Init DB with Super Admin if not exists
     from app.db.session import SessionLocal
@@ -91,11 +137,34 @@ def startup_event():
                 print(f"Default User activated: {default_user_email}")
 
 
+        # Auto-assignment load index pehle se garam, taaki pehla ticket DB warm-up ka wait na kare.
+        from app.services import assignment
+        if assignment.engine is not None:
+            assignment.engine.load(db)
+
     except Exception as e:
         print(f"Error initializing database (Tables might not exist yet): {e}")
     finally:
         db.close()
 
+_background_tasks = []
+
+@app.on_event("startup")
+async def start_background_refresh():
+    # Analytics rollup GET requests mein refresh nahi hota; yahan periodic catch up.
+    if settings.ANALYTICS_REFRESH_INTERVAL_SECONDS > 0:
+        from app.services import ticket_analytics
+        _background_tasks.append(asyncio.create_task(
+            ticket_analytics.refresh_periodically(settings.ANALYTICS_REFRESH_INTERVAL_SECONDS)
+        ))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    security.shutdown_password_pool()  # Password worker threads band.
+
 # Trigger reload to run startup event and create super admin
 @app.get("/")
 def root():
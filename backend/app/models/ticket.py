@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text  # Types import kar rahe hain. `Text` use kiya description ke liye kyunki length unpredictable hai.
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Date, DateTime, Enum, ForeignKey, Text, Index  # Types import kar rahe hain. `Text` use kiya description ke liye kyunki length unpredictable hai.
 from sqlalchemy.orm import relationship  # Models ke beech interactions define karne ke liye.
 from sqlalchemy.sql import func  # Database side methods jaise `now()` ke liye.
 from app.db.session import Base  # Abstract base class.
@@ -19,6 +19,11 @@ class Ticket(Base):  # Ticket model. Ye humare system ka core data structure hai
     
     # Hold Reason
     hold_reason = Column(Text, nullable=True)  # Agar ticket hold pe hai toh kyun? Ye reason store karne ke liye field hai.
+
+    # Optimistic concurrency: har UPDATE `WHERE id = :id AND version = :v` ke saath chalta hai aur version +1 karta hai.
+    # Beech mein kisi aur ne row badli toh 0 rows update, SQLAlchemy StaleDataError deta hai (API pe 412). Row lock nahi lagta.
+    # Raw `update(Ticket)` statements (bulk, claim, auto-open) ko `version=Ticket.version + 1` khud set karna hota hai.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     owner = relationship("app.models.user.User", back_populates="tickets")  # User object access karne ke liye. 'app.models.user.User' string path use kiya circular import avoid karne ke liye.
@@ -26,15 +31,29 @@ class Ticket(Base):  # Ticket model. Ye humare system ka core data structure hai
     attachments = relationship("Attachment", back_populates="ticket", cascade="all, delete-orphan")  # Associated files. 'cascade' use kiya taaki ticket delete hone pe attachments bhi delete ho jayein.
     status_logs = relationship("TicketStatusLog", back_populates="ticket", cascade="all, delete-orphan")  # History logs access karne ke liye.
 
+    __mapper_args__ = {"version_id_col": version}
+
+    # Keyset pagination ke indexes. Listing hamesha (created_at, id) order mein chalti hai, isliye composite index chahiye.
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),  # Admin listing (saare tickets) ke liye.
+        Index("ix_tickets_user_id_created_at_id", "user_id", "created_at", "id"),  # User listing (sirf apne tickets) ke liye.
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),  # `?status=` filter, order bhi index se.
+        # Sub admin ki "my queue" (`?mine=true&status=...`). id index mein hai toh page ke ids index-only scan se aate hain.
+        Index("ix_tickets_assigned_admin_id_status_created_at_id", "assigned_admin_id", "status", "created_at", "id"),
+    )
+
 class Attachment(Base):  # Files store karne ke liye separate table. Taaki ek ticket pe multiple files ho sakein (One-To-Many).
     __tablename__ = "attachments"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)  # Parent ticket ka reference.
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)  # Parent ticket ka reference. Index: selectinload(Ticket.attachments) ka `IN (...)`.
     filename = Column(String, nullable=False)  # User ka original file name.
     file_path = Column(String, nullable=False) # Path on filesystem
     # File kahan store hui hai uska path. DB mein content blob nahi rakhte best practice ke hisaab se.
     file_type = Column(String, nullable=True)  # MIME type (e.g., image/png) taaki frontend sahi se display kare.
+    # Content-addressed store: same content ka ek hi blob disk pe. Is hash wale rows ki ginti hi blob ka reference count hai.
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 hex. Purani (pre-dedup) files ke liye NULL.
+    size_bytes = Column(BigInteger, nullable=True)  # File size, upload ke waqt stream karte hue count hua.
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # Upload time.
 
     ticket = relationship("Ticket", back_populates="attachments")  # Parent ticket object access.
@@ -48,9 +67,45 @@ class TicketStatusLog(Base):  # Audit trail maintain karne ke liye. Jab bhi stat
     new_status = Column(Enum(TicketStatus), nullable=False)  # Naya status kya bana.
     
     # Who changed it via Admin ID
-    changed_by_admin_id = Column(Integer, ForeignKey("admins.id"), nullable=True)  # Kisne status change kiya.
+    changed_by_admin_id = Column(Integer, ForeignKey("admins.id"), nullable=True, index=True)  # Kisne status change kiya. Index: admin ki activity / FK checks.
     
     timestamp = Column(DateTime(timezone=True), server_default=func.now())  # Kab change hua.
 
     ticket = relationship("Ticket", back_populates="status_logs")  # Ticket object.
     changed_by = relationship("app.models.user.Admin")  # Admin details jisne change kiya.
+
+    # Analytics ek ticket ki history (timestamp, id) order mein window functions se padhti hai; ye index wahi order deta hai.
+    __table_args__ = (
+        Index("ix_ticket_status_logs_ticket_id_timestamp_id", "ticket_id", "timestamp", "id"),
+    )
+
+class TicketCounter(Base):  # Dashboard stats ke liye materialized counters. Har (admin, status, shard) ka ek row.
+    __tablename__ = "ticket_counters"
+
+    # 0 matlab unassigned. Primary key mein NULL allowed nahi hota, isliye sentinel value use kiya.
+    admin_key = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(Enum(TicketStatus), primary_key=True)  # Kis status ka count hai.
+    # Counter ko kuch shards mein baanta hai taaki har naya ticket ek hi hot row ko lock na kare.
+    shard = Column(Integer, primary_key=True, autoincrement=False)
+    count = Column(Integer, nullable=False, default=0)  # Current count. Delta se update hota hai, kabhi recount nahi.
+
+class TicketLifecycleRollup(Base):  # Status logs se nikle durations ka daily histogram. Analytics endpoints yahin se padhte hain.
+    __tablename__ = "ticket_lifecycle_rollups"
+
+    day = Column(Date, primary_key=True)  # Duration kis din (UTC) khatam hua.
+    # "first_response", "resolution" ya "in_status:<STATUS>".
+    metric = Column(String(32), primary_key=True)
+    admin_key = Column(Integer, primary_key=True, autoincrement=False)  # 0 matlab koi admin nahi / per-admin metric nahi.
+    bucket = Column(Integer, primary_key=True, autoincrement=False)  # Duration histogram bucket (ticket_analytics.BUCKET_BOUNDS).
+    count = Column(Integer, nullable=False, default=0)  # Is bucket mein kitne durations.
+    total_seconds = Column(Float, nullable=False, default=0)  # Unka sum, exact mean ke liye.
+    # Bucket mein sabse chhota/bada observed duration. Percentile interpolation inke beech clamp hota hai.
+    # Migration se pehle ke rows mein NULL (rebuild tak wahan bucket bounds hi use hote hain).
+    min_seconds = Column(Float, nullable=True)
+    max_seconds = Column(Float, nullable=True)
+
+class RollupWatermark(Base):  # Incremental rollups kahan tak process ho chuke hain.
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)  # Rollup ka naam.
+    last_id = Column(Integer, nullable=False, default=0)  # Is id tak ke source rows rollup mein aa chuke hain.
@@ -1,59 +1,176 @@
-from fastapi import APIRouter, Depends, HTTPException, status  # FastAPI core modules.
+import time  # Health check latency ke liye.
+from datetime import date, datetime, timezone  # Export/analytics filters aur filename.
+from fastapi import APIRouter, Depends, HTTPException, Query, status  # FastAPI core modules.
+from fastapi.responses import StreamingResponse  # Exports chunk by chunk bhejne ke liye.
 from sqlalchemy.orm import Session  # DB connectivity.
-from sqlalchemy import func  # Aggregation functions (count, etc.).
-from typing import List  # Type hints.
+from sqlalchemy import func, text  # Aggregation functions (count, etc.) aur raw health-check SQL.
+from typing import List, Optional  # Type hints.
 
-from app.db.session import get_db  # dependency.
+from app.db.session import get_db, run_db, db_endpoint, release_db, engine, async_engine  # dependency + sync/async DB mode helpers.
+from app.db.pool_metrics import pool_status  # Connection pool live stats.
+from app.db.replicas import get_read_db, status as replica_status  # Read-only endpoints ke liye replica session, aur replica health.
 from app.models.user import User, Admin  # Models.
 from app.models.ticket import Ticket  # Ticket model stats ke liye.
 from app.models.enums import TicketStatus, AdminRole  # Enums stats filtering ke liye.
 from app.schemas.user import UserResponse, AdminResponse, AdminUpdate, AdminCreate  # Schemas.
 from app.routers.deps import get_current_admin, require_senior_admin  # RBAC dependencies.
 from app.core import security  # Password hashing.
+from app.services import ticket_stats  # Dashboard aggregation aur counters.
+from app.services import file_service  # Attachment blob store GC.
+from app.core.principal_cache import principal_cache, invalidate_principal  # Auth cache invalidation aur stats.
+from app.services import assignment  # Auto-assignment ka eligible admins set.
+from app.services import export  # Streaming CSV/NDJSON exports.
+from app.services import ticket_analytics  # Status log se SLA / time-in-status rollups.
 
 router = APIRouter()  # Router init.
 
 # --- Dashboard ---
 
 @router.get("/dashboard/stats")  # Dashboard metrics endpoint.
+@db_endpoint
 def get_dashboard_stats(
     current_admin: Admin = Depends(get_current_admin),  # Koi bhi admin dekh sakta hai stats.
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)  # Read-only: replica pe (configured ho toh).
 ):
     """
     Get generic dashboard stats.
+    One conditional-aggregation query, or an O(1) counters read when TICKET_COUNTERS_ENABLED is set.
     """
-    total_tickets = db.query(Ticket).count()  # Total tickets count.
-    pending_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.PENDING).count()  # Pending tickets count.
-    on_hold_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.ON_HOLD).count()  # Oold tickets count.
-    resolved_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.RESOLVED).count()  # Resolved tickets count.
-    
-    # Per Admin Workload
-    # Group by assigned_admin_id
-    # Ye complex SQL query hai jo har admin ke paas kitne tickets hain count karti hai.
-    workload = db.query(Ticket.assigned_admin_id, func.count(Ticket.id)).group_by(Ticket.assigned_admin_id).all()
-    
-    return {  # JSON summary return kar rahe hain frontend charts ke liye.
-        "total": total_tickets,
-        "pending": pending_tickets,
-        "on_hold": on_hold_tickets,
-        "resolved": resolved_tickets,
-        "workload": [{"admin_id": w[0], "count": w[1]} for w in workload]  # List comprehension data format karne ke liye.
+    return ticket_stats.get_dashboard_stats(db)  # JSON summary return kar rahe hain frontend charts ke liye.
+
+@router.post("/dashboard/stats/rebuild")  # Counters table ko tickets se dobara calculate karne ke liye.
+@db_endpoint
+def rebuild_dashboard_counters(
+    current_admin: Admin = Depends(require_senior_admin),  # Heavy operation hai, sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """Recompute the materialized ticket counters from the tickets table."""
+    buckets = ticket_stats.rebuild_counters(db)
+    db.commit()
+    return {"message": "Ticket counters rebuilt", "buckets": len(buckets)}
+
+# --- Analytics ---
+
+def _check_days(date_from: Optional[date], date_to: Optional[date]) -> None:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+
+@router.get("/analytics/lifecycle")  # First response, resolution aur time-in-status SLA numbers.
+@db_endpoint
+def get_lifecycle_analytics(
+    date_from: Optional[date] = None,  # Din (UTC) jis din duration khatam hua, inclusive.
+    date_to: Optional[date] = None,
+    current_admin: Admin = Depends(get_current_admin),  # Koi bhi admin dekh sakta hai, dashboard jaisa.
+    db: Session = Depends(get_read_db)  # Sirf rollup padhta hai: replica pe (configured ho toh).
+):
+    """
+    Ticket lifecycle SLA numbers (count, mean, p50/p90/p99 seconds) from the status log rollup.
+    Read-only: the rollup is topped up in the background; `rollup_lag_seconds` says how far behind it is.
+    """
+    _check_days(date_from, date_to)
+    result = ticket_analytics.lifecycle_summary(db, date_from, date_to)
+    result.update(ticket_analytics.rollup_freshness(db))
+    return result
+
+@router.get("/analytics/throughput")  # Per-admin resolved tickets aur first responses.
+@db_endpoint
+def get_admin_throughput(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db)  # Read-only.
+):
+    """Per-admin throughput (resolutions, first responses, mean resolution time) from the rollup."""
+    _check_days(date_from, date_to)
+    return {
+        "admins": ticket_analytics.admin_throughput(db, date_from, date_to),
+        **ticket_analytics.rollup_freshness(db),
     }
 
+@router.post("/analytics/refresh")  # Background refresh ka wait kiye bina rollup abhi catch up karao.
+@db_endpoint
+def refresh_lifecycle_analytics(
+    current_admin: Admin = Depends(require_senior_admin),  # Synchronous catch-up DB pe bhaari pad sakta hai, sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """Fold every settled status log into the rollup now and report how many batches that took."""
+    return ticket_analytics.catch_up(db)
+
+@router.post("/analytics/rebuild")  # Rollup ko poori status log history se dobara banana.
+@db_endpoint
+def rebuild_lifecycle_analytics(
+    current_admin: Admin = Depends(require_senior_admin),  # Heavy operation hai, sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """Recompute the lifecycle rollup from the full status log."""
+    return ticket_analytics.rebuild_rollups(db)
+
+# --- Exports ---
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _export_response(chunks, name: str, fmt: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{fmt}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _check_range(start: Optional[datetime], end: Optional[datetime]) -> None:
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="Range start must be before range end")
+
+
+@router.get("/export/tickets")  # Poori tickets table CSV/NDJSON mein stream.
+async def export_tickets(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),  # `?format=ndjson`.
+    status: Optional[List[TicketStatus]] = Query(None),  # `?status=Pending&status=On Hold`.
+    created_from: Optional[datetime] = None,  # created_at >= created_from.
+    created_to: Optional[datetime] = None,  # created_at < created_to.
+    current_admin: Admin = Depends(require_senior_admin),  # Saare users ka data, sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """
+    Stream matching tickets as CSV or NDJSON, ordered by id.
+    Rows come from a server-side cursor in fixed batches, so memory stays flat whatever the table size.
+    """
+    _check_range(created_from, created_to)
+    await release_db(db)  # Auth ho gaya; export apna session kholta hai, request wala connection stream bhar hold na rahe.
+    return _export_response(export.ticket_export(fmt, status, created_from, created_to), "tickets", fmt)
+
+
+@router.get("/export/status-logs")  # Status change audit log CSV/NDJSON mein stream.
+async def export_status_logs(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    status: Optional[List[TicketStatus]] = Query(None),  # new_status filter.
+    changed_from: Optional[datetime] = None,  # timestamp >= changed_from.
+    changed_to: Optional[datetime] = None,  # timestamp < changed_to.
+    current_admin: Admin = Depends(require_senior_admin),  # Audit log sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """Stream the ticket status audit log as CSV or NDJSON, ordered by id."""
+    _check_range(changed_from, changed_to)
+    await release_db(db)
+    return _export_response(export.status_log_export(fmt, status, changed_from, changed_to), "status-logs", fmt)
+
 # --- User Management ---
 
 @router.get("/users", response_model=List[UserResponse])  # Saare users list karne ke liye.
+@db_endpoint
 def list_users(
     skip: int = 0, limit: int = 100,  # Pagination params default 0 aur 100.
     current_admin: Admin = Depends(get_current_admin),  # Only admins allowed.
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)  # Read-only: replica pe (configured ho toh).
 ):
     """List all users."""
     users = db.query(User).offset(skip).limit(limit).all()  # Paginated query.
     return users  # List of UserResponse objects.
 
 @router.put("/users/{user_id}/approve")  # User activity toggle karne ke liye.
+@db_endpoint
 def approve_user(
     user_id: int,  # URL path param.
     approve: bool,  # Query param (true/false).
@@ -69,17 +186,22 @@ def approve_user(
     
     user.is_active = approve  # Status update.
     db.commit()  # Save changes.
+    invalidate_principal("user", user.email)  # Cached principal purana is_active dikhata, isliye hata diya.
     return {"message": f"User {'approved' if approve else 'blocked'}"}  # Success message.
 
 # --- Admin Management (Senior Only) ---
 
 @router.post("/", response_model=AdminResponse)  # Naya admin create karne ke liye.
-def create_admin(
+async def create_admin(
     admin_in: AdminCreate, 
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(require_senior_admin)  # Sirf super admin hi naye admins bana sakta hai.
 ):
     """Create a new admin. Only Senior Admins can do this."""
+    hashed_password = await security.get_password_hash_async(admin_in.password)  # bcrypt password pool pe, request path pe nahi.
+    return await run_db(db, _insert_admin, admin_in, hashed_password)
+
+def _insert_admin(db: Session, admin_in: AdminCreate, hashed_password: str):
     admin = db.query(Admin).filter(Admin.email == admin_in.email).first()  # Duplicate check.
     if admin:
         raise HTTPException(
@@ -89,7 +211,7 @@ def create_admin(
     
     admin_obj = Admin(
         email=admin_in.email,
-        hashed_password=security.get_password_hash(admin_in.password),
+        hashed_password=hashed_password,
         full_name=admin_in.full_name,
         role=admin_in.role,
         is_active=True # Auto-active for testing
@@ -97,17 +219,20 @@ def create_admin(
     db.add(admin_obj)
     db.commit()
     db.refresh(admin_obj)
+    assignment.admin_updated(admin_obj.id, admin_obj.role, admin_obj.is_active)  # Naya admin auto-assignment mein.
     return admin_obj
 
 @router.get("/", response_model=List[AdminResponse])  # List all admins.
+@db_endpoint
 def list_admins(
     current_admin: Admin = Depends(get_current_admin), # All admins can see peers?
     # Han, peer admins ko dekhna useful hota hai coordination ke liye.
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)  # Read-only: replica pe (configured ho toh).
 ):
     return db.query(Admin).all()  # Saare admins return.
 
 @router.put("/{admin_id}/approve")  # Admin approval workflow.
+@db_endpoint
 def approve_admin(
     admin_id: int,
     approve: bool,
@@ -121,4 +246,56 @@ def approve_admin(
     
     admin.is_active = approve  # Activate/Deactivate.
     db.commit()
+    invalidate_principal("admin", admin.email)  # Cache se stale entry hatayi.
+    assignment.admin_updated(admin.id, admin.role, admin.is_active)  # Deactivate hua toh naye tickets nahi milenge.
     return {"message": f"Admin {'approved' if approve else 'rejected'}"}
+
+# --- System ---
+
+@router.get("/system/assignment")  # Auto-assignment load index.
+async def assignment_status(
+    current_admin: Admin = Depends(require_senior_admin),
+):
+    """Current auto-assignment strategy and the in-memory open-ticket load per admin."""
+    if assignment.engine is None:
+        return {"strategy": None}
+    return assignment.engine.snapshot()
+
+@router.get("/system/principal-cache")  # Auth cache ke hit/miss counters.
+async def get_principal_cache_stats(
+    current_admin: Admin = Depends(require_senior_admin),  # Internal metrics sirf senior admin ke liye.
+):
+    """Hit/miss counters of the token-to-principal cache."""
+    return principal_cache.stats()
+
+@router.post("/system/blobs/gc")  # Attachment blob store se unreferenced files hatane ke liye.
+@db_endpoint
+def gc_attachment_blobs(
+    current_admin: Admin = Depends(require_senior_admin),  # Disk pe delete karta hai, sirf senior admin.
+    db: Session = Depends(get_db)
+):
+    """Delete content-addressed blobs that no attachment references any more."""
+    return {"removed": file_service.gc_orphan_blobs(db)}
+
+@router.get("/system/db")  # DB health aur connection pool metrics.
+async def get_db_health(
+    current_admin: Admin = Depends(require_senior_admin),  # Internal metrics sirf senior admin ke liye.
+    db: Session = Depends(get_db)
+):
+    """Database round-trip health check plus live connection pool stats (checkouts, waits, overflow, timeouts)."""
+    started = time.perf_counter()
+    try:
+        await run_db(db, lambda session: session.execute(text("SELECT 1")).scalar())  # Sabse sasta round trip.
+        healthy, error = True, None
+    except Exception as exc:  # Health endpoint khud fail nahi hona chahiye, error report karna hai.
+        healthy, error = False, str(exc)
+    result = {
+        "healthy": healthy,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        "error": error,
+        "pool": pool_status(engine),
+    }
+    if async_engine is not None:
+        result["async_pool"] = pool_status(async_engine.sync_engine)
+    result["replicas"] = replica_status()
+    return result
@@ -5,7 +5,7 @@ from datetime import timedelta  # Expiration calculation ke liye.
 
 from app.core import security  # Password hashing/verification logic.
 from app.core.config import settings  # JWT expiration settings.
-from app.db.session import get_db  # DB connection dependency.
+from app.db.session import get_db, run_db  # DB connection dependency aur sync/async query helper.
 from app.models.user import User, Admin  # User aur Admin models login check ke liye.
 from app.schemas.user import UserCreate, UserResponse, AdminCreate, AdminResponse  # (Unused but imported) Schemas.
 from app.schemas.token import Token  # Response schema token ke liye.
@@ -14,19 +14,28 @@ from app.models.enums import AdminRole  # (Unused here but good for context)
 router = APIRouter()  # Router instance.
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Unified login for both Users and Admins.
     Logic:
     1. Try to find user in User table.
-    2. If found, verify password.
+    2. If found, verify password (and stop there either way).
     3. If not found in User table, try to find in Admin table.
     4. If found in Admin, verify password.
     5. If neither, raise 400.
+    Password checks run on the bounded password pool; a saturated pool answers 429.
     """
     # 1. Check User table
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if user and security.verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, _find_account, User, form_data.username)
+    if user:
+        # Email User pool mein mil gaya, toh sirf yahi ek bcrypt check hoga. Password galat hai toh Admin table try nahi karte,
+        # warna har galat attempt pe do bcrypt checks lagte the.
+        if not await security.verify_password_async(form_data.password, user.hashed_password):
+            raise HTTPException(
+                status_code=400,
+                detail="Incorrect email or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
         if not user.is_active:
             raise HTTPException(status_code=400, detail="User account is not active")
         
@@ -36,15 +45,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
         return {"access_token": access_token, "token_type": "bearer"}
 
-    # 2. Check Admin table (Logic falls through here if User not found OR password wrong)
-    # Note: Technically if User found but password wrong, we shouldn't check Admin, 
-    # but for simplicity/unified creds (email could be same?), we can check both.
-    # However, usually email is unique across system.
-    # If user object existed but password failed, we might stop there.
-    # But let's assume separate pools.
-    
-    admin = db.query(Admin).filter(Admin.email == form_data.username).first()
-    if admin and security.verify_password(form_data.password, admin.hashed_password):
+    # 2. Check Admin table (sirf tab jab email User table mein nahi mila)
+    admin = await run_db(db, _find_account, Admin, form_data.username)
+    if admin and await security.verify_password_async(form_data.password, admin.hashed_password):
         if not admin.is_active:
              raise HTTPException(status_code=400, detail="Admin account pending approval")
              
@@ -60,3 +63,6 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         detail="Incorrect email or password",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _find_account(db: Session, model, email: str):
+    return db.query(model).filter(model.email == email).first()
@@ -1,11 +1,13 @@
-from fastapi import Depends, HTTPException, status  # FastAPI ke dependency injection helpers aur exceptions import kar rahe hain.
+from typing import Optional  # Optional query token.
+from fastapi import Depends, HTTPException, Query, status  # FastAPI ke dependency injection helpers aur exceptions import kar rahe hain.
 from fastapi.security import OAuth2PasswordBearer  # Security scheme jo token extract karega 'Authorization: Bearer <token>' header se.
 from jose import jwt, JWTError  # JWT encode/decode lib.
 from sqlalchemy.orm import Session  # DB session type hint.
 
 from app.core import security  # Password/Token logic.
 from app.core.config import settings  # Config for secrets/algorithms.
-from app.db.session import get_db  # DB session dependency factory.
+from app.core.principal_cache import principal_cache, CachedPrincipal  # Token -> principal cache.
+from app.db.session import get_db, release_db, run_db  # DB session dependency factory aur sync/async dono mode mein query chalane ka helper.
 from app.models.user import User, Admin  # User/Admin models user fetch karne ke liye.
 from app.schemas.token import TokenPayload  # Token data validation schema.
 from app.models.enums import AdminRole  # Role validation ke liye enum.
@@ -17,6 +19,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login/user")
 # The user will likely use /auth/login/user or /auth/login/admin.
 # Swagger UI only supports one tokenUrl easily, so we point to user for default.
 # Reality mein humare paas multiple login points hain (Admin/User), par Swagger UI limitation ke karan ek hi dikhaya hai.
+# Event stream ke liye: browser ka EventSource headers set nahi kar sakta, isliye wahan token query param se bhi aa sakta hai.
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login/user", auto_error=False)
 
 async def get_current_user_or_admin(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
@@ -25,11 +29,52 @@ async def get_current_user_or_admin(
     Common dependency to extract user from token.
     Works for both 'User' and 'Admin'.
     """
+    return await resolve_principal(token, db)
+
+async def get_stream_token(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None),  # `?token=` EventSource ke liye.
+) -> Optional[str]:
+    """Bearer token from the Authorization header, or from `?token=` when the client cannot set headers."""
+    return header_token or token
+
+async def get_stream_principal(
+    token: Optional[str] = Depends(get_stream_token),
+    db: Session = Depends(get_db),
+):
+    """Like `get_current_active_user`, but also accepts the token as a query parameter."""
+    principal = await resolve_principal(token, db)
+    if not principal.is_active:  # Banned user stream bhi nahi khol sakta.
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+async def principal_still_active(token: str, db) -> bool:
+    """
+    Re-resolve a long-lived stream's token: False once it has expired or its principal is gone or inactive.
+    Goes through the principal cache, so a DB lookup happens at most once per cache TTL.
+    """
+    try:
+        principal = await resolve_principal(token, db)
+    except HTTPException:
+        return False
+    finally:
+        await release_db(db)  # Cache miss pe connection liya ho toh turant pool mein wapas.
+    return principal.is_active
+
+def token_expiry(token: str) -> Optional[float]:
+    """`exp` claim of an already verified token as a Unix timestamp, or None if it has none."""
+    exp = jwt.get_unverified_claims(token).get("exp")
+    return float(exp) if exp is not None else None
+
+async def resolve_principal(token: Optional[str], db):
+    """Decode a bearer token and return the cached or freshly loaded principal, or raise 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,  # 401 error throw karenge agar validation fail hui.
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         # Token decode kar rahe hain secret key use karke. Agar key mismatch hui toh error aayega.
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -41,22 +86,34 @@ async def get_current_user_or_admin(
     except JWTError:  # Agar token expire ho gaya ya signature galat hai.
         raise credentials_exception
 
-    if token_data.type == "admin":
+    # Pehle in-process cache check karo. Hit hua toh DB round trip hi nahi hoga.
+    cache_key = (token_data.type, token_data.sub)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+
+    # Cache miss: DB lookup. `run_db` sync mode mein threadpool aur async mode mein AsyncSession use karta hai,
+    # taaki ye async dependency event loop ko block na kare.
+    principal = await run_db(db, _load_principal, token_data.type, token_data.sub)
+    if principal is None:  # Agar DB mein record nahi mila (delete ho gaya ho user).
+        raise credentials_exception
+    
+    principal_cache.set(cache_key, principal)  # Agli request ke liye cache mein daal diya.
+    return principal  # Authenticated principal return kar rahe hain.
+
+def _load_principal(db: Session, user_type: str, sub: str):
+    if user_type == "admin":
         # Check Admin Table
         # Token type 'admin' hai toh Admin table mein search karenge.
-        user = db.query(Admin).filter(Admin.email == token_data.sub).first()
+        user = db.query(Admin).filter(Admin.email == sub).first()
     else:
         # Check User Table
         # Warna User table mein.
-        user = db.query(User).filter(User.email == token_data.sub).first()
-        
-    if user is None:  # Agar DB mein record nahi mila (delete ho gaya ho user).
-        raise credentials_exception
-    
-    # Attach type to user object for easier checking later if needed (python dynamic attribute)
-    # Python ki dynamic capabilities ka use karke ek naya attribute 'is_admin_user' chipka rahe hain object pe.
-    user.is_admin_user = (token_data.type == "admin")
-    return user  # Authenticated user object return kar rahe hain.
+        user = db.query(User).filter(User.email == sub).first()
+    if user is None:
+        return None
+    # Detached snapshot bana rahe hain, 'is_admin_user' flag ke saath, taaki baaki checks (RoleChecker etc.) same rahein.
+    return CachedPrincipal.from_model(user, is_admin_user=(user_type == "admin"))
 
 async def get_current_active_user(
     current_user = Depends(get_current_user_or_admin),
@@ -75,7 +132,7 @@ class RoleChecker:
     def __init__(self, allowed_roles: list[AdminRole]):
         self.allowed_roles = allowed_roles  # Constructor mein allowed roles le rahe hain.
 
-    def __call__(self, user = Depends(get_current_active_user)):  # Ye instance ko callable banata hai taaki FastAPI `Depends(checker)` kar sake.
+    async def __call__(self, user = Depends(get_current_active_user)):  # Ye instance ko callable banata hai taaki FastAPI `Depends(checker)` kar sake.
         if not getattr(user, "is_admin_user", False):  # Pehle check karo ki wo admin hai bhi ya nahi.
              raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, 
@@ -96,13 +153,13 @@ require_sub_admin = RoleChecker([AdminRole.SENIOR, AdminRole.SUB]) # Senior usua
 require_junior_admin = RoleChecker([AdminRole.SENIOR, AdminRole.SUB, AdminRole.JUNIOR])  # Koi bhi admin level.
 
 # Helper for just ensuring it's ANY admin
-def get_current_admin(user = Depends(get_current_active_user)):
+async def get_current_admin(user = Depends(get_current_active_user)):
     if not getattr(user, "is_admin_user", False):
         raise HTTPException(status_code=403, detail="Admins only")
     return user
 
 # Helper for User only
-def get_current_regular_user(user = Depends(get_current_active_user)):
+async def get_current_regular_user(user = Depends(get_current_active_user)):
     # Admin regular user routes use na kar sake, uske logic ke liye.
     if getattr(user, "is_admin_user", False):
          raise HTTPException(status_code=403, detail="Regular users only")
@@ -1,21 +1,34 @@
-import shutil  # File operations ke liye (save karne ke liye).
 import os  # OS file path handling ke liye.
+import hashlib  # List page ka ETag fingerprint.
+from datetime import datetime, timezone  # created_at range filters aur Last-Modified.
+from email.utils import format_datetime, parsedate_to_datetime  # HTTP dates (Last-Modified / If-Modified-Since).
+from urllib.parse import quote  # Content-Disposition mein filename safely encode karne ke liye.
 from typing import List, Optional  # Type hints.
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form  # FastAPI tools endpoint define aur data handle karne ke liye.
-from sqlalchemy.orm import Session  # DB connectivity.
-from sqlalchemy import or_  # Complex queries ke liye.
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status, UploadFile, File, Form  # FastAPI tools endpoint define aur data handle karne ke liye.
+from fastapi.responses import FileResponse, StreamingResponse  # Range/sendfile file serving, aur live event stream.
+from sqlalchemy.orm import Session, selectinload  # DB connectivity. `selectinload` relationships ko batch mein load karta hai.
+from sqlalchemy import func, insert, or_, select, tuple_, update  # Complex queries, keyset (row value) comparison aur set-based bulk writes.
+from sqlalchemy.orm.exc import StaleDataError  # Version check fail (concurrent edit).
 
-from app.db.session import get_db  # dependency.
+from app.db.session import get_db, run_db, db_endpoint, release_db  # dependency + sync/async DB mode helpers.
+from app.db.replicas import get_read_db  # Read-only endpoints ke liye replica session.
 from app.models.user import User, Admin  # Models.
 from app.models.ticket import Ticket, Attachment, TicketStatusLog  # Models.
 from app.models.enums import TicketStatus, AdminRole  # Enums.
-from app.schemas.ticket import TicketCreate, TicketResponse, TicketUpdate  # Pydantic Schemas.
-from app.routers.deps import get_current_user_or_admin, get_current_regular_user, get_current_admin  # RBAC logic.
+from app.schemas.ticket import TicketCreate, TicketResponse, TicketUpdate, TicketPage, TicketBulkUpdate, TicketBulkResult  # Pydantic Schemas.
+from app.routers.deps import get_current_user_or_admin, get_current_regular_user, get_current_admin, get_stream_principal, get_stream_token  # RBAC logic.
+from app.routers.deps import principal_still_active, token_expiry  # Long-lived stream ka auth re-check.
 from app.core.config import settings  # Settings (unused here but good practice).
+from app.services import ticket_stats  # Dashboard counters ko ticket changes ke saath update karne ke liye.
+from app.services import file_service  # Streaming uploads.
+from app.services import ticket_search  # Full-text search (Postgres) / LIKE fallback.
+from app.services import events  # Live ticket events (SSE).
+from app.services import assignment  # Naye tickets ka auto-assignment.
+from app.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, keyset_datetime  # Keyset cursor helpers.
 
 router = APIRouter()  # Router initialization.
 
-UPLOAD_DIR = "uploads"  # Images kahan save hongi.
+UPLOAD_DIR = settings.UPLOAD_DIR  # Images kahan save hongi.
 if not os.path.exists(UPLOAD_DIR):  # Directory nahi hai toh banao.
     os.makedirs(UPLOAD_DIR)
 
@@ -31,6 +44,87 @@ def log_status_change(db: Session, ticket: Ticket, new_status: TicketStatus, adm
         )
         db.add(log) # Add to session, commit happens later
         # Session mein add kiya, par commit caller karega transaction consistency ke liye.
+        # Live event bhi isi transaction ke saath queue hota hai, commit hone pe hi subscribers tak jayega.
+        events.queue_event(db, events.TicketEvent(
+            type=events.TICKET_STATUS_CHANGED,
+            ticket_id=ticket.id,
+            owner_id=ticket.user_id,
+            assigned_admin_id=ticket.assigned_admin_id,
+            data={"old_status": ticket.status.value if ticket.status else None, "new_status": new_status.value, "changed_by_admin_id": admin_id},
+        ))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (RFC 7232)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):  # Browser ek se zyada ETags bhej sakta hai.
+        tag = tag.strip()
+        if tag.startswith("W/"):  # Weak comparison: W/ prefix ignore, sirf opaque value match honi chahiye.
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def ticket_etag(ticket: Ticket) -> str:
+    """Strong ETag of a ticket: id plus its optimistic-concurrency version."""
+    return f'"{ticket.id}-{ticket.version}"'
+
+def if_match_satisfied(if_match: Optional[str], etag: str) -> bool:
+    """Strong comparison of an If-Match header against the current ETag (RFC 7232). No header = no precondition."""
+    if not if_match:
+        return True
+    if if_match.strip() == "*":
+        return True
+    # If-Match mein weak ETags (W/) kabhi match nahi karte.
+    return any(tag.strip() == etag for tag in if_match.split(",") if not tag.strip().startswith("W/"))
+
+REVALIDATE = "private, no-cache"  # Browser/dashboard cache rakh sakta hai, par har baar ETag se revalidate kare.
+
+def http_date(value: datetime) -> str:
+    """Format a DB timestamp as an HTTP date (naive values are UTC, like SQLite CURRENT_TIMESTAMP)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was sent (RFC 7232 section 6)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):  # Galat date header ignore, jaise spec kehta hai.
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since  # HTTP date mein seconds tak hi precision hai.
+
+TICKET_CONFLICT_DETAIL = "Ticket was modified by someone else. Reload it and retry."
+
+def ticket_query(db: Session):
+    """
+    Base ticket query with attachments and status logs batch-loaded.
+    TicketResponse nests both lists, so without this every ticket fires two lazy SELECTs during serialization.
+    """
+    # selectinload: ek page ke saare tickets ke attachments ek `IN (...)` query mein, aur logs doosri mein.
+    # Page 100 ka ho ya 1 ka, total queries fixed rehti hain (tickets + attachments + logs = 3).
+    return db.query(Ticket).options(
+        selectinload(Ticket.attachments),
+        selectinload(Ticket.status_logs),
+    )
+
+def load_ticket(db: Session, ticket_id: int):
+    """Fetch one ticket with its relationships, refreshing any stale copy in the session."""
+    # `populate_existing` commit ke baad expire hue object ko fresh data se bhar deta hai, `db.refresh` ki jagah.
+    return ticket_query(db).populate_existing().filter(Ticket.id == ticket_id).first()
 
 # --- Endpoints ---
 
@@ -43,118 +137,386 @@ async def create_ticket(
 ):
     """
     User raises a new ticket.
-    Uploads files to server filesystem.
+    Uploads are streamed to temp files off the event loop and moved into place only after the commit.
     """
-    # Create Ticket
-    ticket = Ticket(
-        user_id=current_user.id,  # User link kar rahe hain.
-        description=description,  # Issue detail.
-        status=TicketStatus.PENDING  # By default Pending hota hai.
-    )
-    db.add(ticket)  # Add ticket object.
-    db.flush() # Get ID
-    # 'flush' use kiya taaki DB ID generate kar de bina final commit kiye. Hum ID use karke filename banayenge.
-
-    # Handle Files
-    if files:  # Agar files aayi hain.
-        for file in files:
-            # Validate size/type here if needed
-            # Simple unique filename
-            # Filename unique banane ke liye ID prefix laga rahe hain. Collision avoid karne ke liye.
-            file_extension = os.path.splitext(file.filename)[1]
-            saved_filename = f"ticket_{ticket.id}_{file.filename}"
-            file_path = os.path.join(UPLOAD_DIR, saved_filename)  # Full path construct kar rahe hain.
-            
-            with open(file_path, "wb") as buffer:  # File write mode mein open kiya.
-                shutil.copyfileobj(file.file, buffer)  # Stream copy kiya taaki memory overflow na ho bade files pe.
-            
+    # Pehle files stream karke temp mein likh rahe hain (event loop block nahi hota). DB transaction tab tak shuru hi nahi hua.
+    staged = []
+    try:
+        for file in files or []:
+            staged.append(await file_service.stage_upload(file))
+        ticket_id = await run_db(db, _insert_ticket, current_user.id, description, staged)
+    except file_service.UploadTooLarge:
+        file_service.discard(staged)
+        raise HTTPException(status_code=413, detail=f"File too large. Limit is {settings.MAX_UPLOAD_SIZE_BYTES} bytes.")
+    except BaseException:
+        # Transaction fail hua toh temp files hata do, `uploads/` mein koi orphan file nahi bachegi.
+        file_service.discard(staged)
+        raise
+
+    # Commit ho gaya, ab temp files ko atomic rename se final jagah pe le ja rahe hain.
+    for item in staged:
+        file_service.promote(item)
+    return await run_db(db, load_ticket, ticket_id)  # Latest state relationships ke saath reload, taaki serialization mein lazy loads na hon.
+
+def _insert_ticket(db: Session, user_id: int, description: str, staged: list) -> int:
+    """Insert the ticket and its attachment rows in one transaction; returns the new ticket id."""
+    # Auto-assignment on ho toh in-memory load index se admin chuna (tickets table scan nahi hota).
+    assigned_admin_id = assignment.engine.choose(db, user_id) if assignment.engine is not None else None
+    try:
+        # Create Ticket
+        ticket = Ticket(
+            user_id=user_id,  # User link kar rahe hain.
+            description=description,  # Issue detail.
+            status=TicketStatus.PENDING,  # By default Pending hota hai.
+            assigned_admin_id=assigned_admin_id,
+        )
+        db.add(ticket)  # Add ticket object.
+        db.flush() # Get ID
+        # 'flush' use kiya taaki DB ID generate kar de bina final commit kiye. Hum ID use karke filename banayenge.
+        ticket_stats.record_ticket_created(db, ticket)  # Counters same transaction mein update, taaki rollback pe bhi sync rahein.
+        events.queue_event(db, events.TicketEvent(
+            type=events.TICKET_CREATED, ticket_id=ticket.id, owner_id=user_id,
+            assigned_admin_id=assigned_admin_id,
+            data={"status": TicketStatus.PENDING.value, "auto_assigned": assigned_admin_id is not None},
+        ))
+
+        # Handle Files
+        for item in staged:
+            # Content-addressed path: same file 500 tickets pe attach ho toh bhi disk pe ek hi copy.
+            item.final_path = file_service.blob_path(item.sha256)
             attachment = Attachment(  # Attachment record DB mein bana rahe hain.
                 ticket_id=ticket.id,
-                filename=file.filename,
-                file_path=file_path,
-                file_type=file.content_type  # File type store kar rahe hain for frontend.
+                filename=item.filename,
+                file_path=item.final_path,
+                file_type=item.content_type,  # File type store kar rahe hain for frontend.
+                content_hash=item.sha256,  # Blob ka reference.
+                size_bytes=item.size,
             )
             db.add(attachment)
 
-    db.commit()  # Sab kuch save kar rahe hain (Ticket + Attachments) ek transaction mein.
-    db.refresh(ticket)  # Object ko latest state se update kar rahe hain return karne se pehle.
-    return ticket
+        db.commit()  # Sab kuch save kar rahe hain (Ticket + Attachments) ek transaction mein.
+    except BaseException:
+        db.rollback()
+        if assigned_admin_id is not None:
+            assignment.engine.release(assigned_admin_id)  # Ticket bana hi nahi, reserve kiya load wapas.
+        raise
+    return ticket.id
 
-@router.get("/", response_model=List[TicketResponse])  # List tickets endpoint.
+@router.get("/", response_model=TicketPage)  # List tickets endpoint.
+@db_endpoint
 def read_tickets(
-    skip: int = 0, 
-    limit: int = 100,
+    request: Request,  # If-None-Match padhne ke liye.
+    response: Response,  # ETag header ke liye.
+    cursor: Optional[str] = None,  # Pichle page ka `next_cursor`. Pehle page ke liye khali chhod do.
+    limit: int = Query(100, ge=1, le=100),  # Page size. Upper bound rakha taaki koi ek request mein poori table na maang le.
+    status: Optional[List[TicketStatus]] = Query(None),  # `?status=Pending&status=On Hold`. Kai statuses ek saath.
+    assigned_admin_id: Optional[int] = None,  # Kisi ek admin ki queue (admins only).
+    unassigned: bool = False,  # Sirf unassigned tickets (admins only).
+    mine: bool = False,  # Admin ki apni queue: mujhe assigned tickets.
+    user_id: Optional[int] = None,  # Kisi ek user ke tickets (admins only).
+    created_from: Optional[datetime] = None,  # created_at >= created_from.
+    created_to: Optional[datetime] = None,  # created_at < created_to.
+    order: str = Query("newest", pattern="^(newest|oldest)$"),  # Sort order. Cursor isi order ke saath valid hai.
     current_user = Depends(get_current_user_or_admin),  # Dono user aur admin dekh sakte hain, par logic alag hai.
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)  # Read-only: replica pe (configured ho toh).
 ):
     """
-    Get tickets.
-    - User: Sees only their own.
-    - Admin: Sees all (Senior), or Assigned (Sub).
+    Get tickets using keyset pagination on (created_at, id), filtered server-side.
+    - User: Sees only their own (admin-only filters are rejected).
+    - Admin: Sees all; `mine=true` is the sub admin's own queue.
+    Pass the returned `next_cursor` back as `cursor`, with the same filters and order, to get the next page.
+    Sends a weak ETag fingerprinting the page; a matching If-None-Match gets 304 before the page is loaded.
     """
-    if getattr(current_user, "is_admin_user", False):  # Agar admin hai.
-        # Admin Logic
-        admin: Admin = current_user
-        query = db.query(Ticket)  # Saare tickets ki query start ki.
-        
-        # Admin Role Filtering
-        if admin.role == AdminRole.SUB:
-            # Sub Admin: View assigned tickets? Prompt says "View assigned tickets".
-            # Also implies they might view others but primary is assigned?
-            # "View assigned tickets" -> usually implies restriction.
-            # But "Check progress of all admins" is Senior.
-            # Let's filter by assignment for Sub Admin, OR all unassigned?
-            # Prompt doesn't strictly forbid viewing others, but "View assigned tickets" is specific.
-            # Let's show All keys for simplicity but frontend can filter, OR implement filter params.
-            # To be strict:
-            # query = query.filter(or_(Ticket.assigned_admin_id == admin.id, Ticket.assigned_admin_id == None))
-            pass # Creating universal view for now as Dashboard usually shows all pending.
-            # Abhi ke liye sab dikha rahe hain taaki dashboard khali na lage. Filter frontend pe laga sakte hain.
-            
-        tickets = query.offset(skip).limit(limit).all()  # Pagination apply kiya.
-        return tickets
+    is_admin = getattr(current_user, "is_admin_user", False)
+    if (assigned_admin_id is not None) + unassigned + mine > 1:  # Teeno assignee filters ek doosre ko kaatte hain.
+        raise HTTPException(status_code=400, detail="Use only one of assigned_admin_id, unassigned or mine")
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+
+    dialect_name = db.get_bind().dialect.name
+    # Phase 1 sirf (created_at, id) select karta hai. Filter columns + ye dono composite index mein hain,
+    # toh Postgres index-only scan se page ke ids nikal leta hai, table rows chhue bina.
+    query = db.query(Ticket.created_at, Ticket.id)
+
+    if is_admin:
+        # Admin sab dekh sakta hai. Pehle sub admin ko bhi universal view milta tha aur filter frontend pe lagta tha,
+        # ab `mine=true` se unki queue server pe hi filter hoti hai. Index: ix_tickets_assigned_admin_id_status_created_at_id.
+        if mine:
+            query = query.filter(Ticket.assigned_admin_id == current_user.id)
+        elif unassigned:
+            query = query.filter(Ticket.assigned_admin_id.is_(None))
+        elif assigned_admin_id is not None:
+            query = query.filter(Ticket.assigned_admin_id == assigned_admin_id)
+        if user_id is not None:
+            query = query.filter(Ticket.user_id == user_id)  # Index: ix_tickets_user_id_created_at_id.
+    else:
+        if mine or unassigned or assigned_admin_id is not None or user_id is not None:
+            raise HTTPException(status_code=403, detail="Only admins can filter by assignee or user")
+        # User sirf apne tickets dekh payega privacy ke liye. Index: ix_tickets_user_id_created_at_id.
+        query = query.filter(Ticket.user_id == current_user.id)
+
+    if status:
+        query = query.filter(Ticket.status.in_(status))  # Index: ix_tickets_status_created_at_id.
+    if created_from:
+        query = query.filter(Ticket.created_at >= keyset_datetime(dialect_name, created_from))
+    if created_to:
+        query = query.filter(Ticket.created_at < keyset_datetime(dialect_name, created_to))
+
+    newest_first = order == "newest"
+    if cursor:
+        # Cursor decode karke seedha us row ke baad se shuru kar rahe hain. OFFSET ki tarah pichli rows scan nahi hoti.
+        try:
+            last_created_at, last_id = decode_cursor(cursor, 2)
+            last_created_at = parse_cursor_datetime(last_created_at)
+            if not isinstance(last_id, int):  # Id hamesha integer hona chahiye.
+                raise ValueError("Invalid cursor")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        key = tuple_(Ticket.created_at, Ticket.id)
+        boundary = tuple_(keyset_datetime(dialect_name, last_created_at), last_id)
+        query = query.filter(key < boundary if newest_first else key > boundary)
+
+    # Stable order: created_at tie hone pe id decide karega, isliye har call pe same order milega.
+    if newest_first:
+        query = query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
     else:
-        # User Logic
-        # User sirf apne tickets dekh payega privacy ke liye.
-        return db.query(Ticket).filter(Ticket.user_id == current_user.id).offset(skip).limit(limit).all()
+        query = query.order_by(Ticket.created_at.asc(), Ticket.id.asc())
+    keys = query.limit(limit + 1).all()  # Ek extra row fetch ki taaki pata chale agla page hai ya nahi.
+
+    next_cursor = None
+    if len(keys) > limit:  # Extra row mili matlab aur data baaki hai.
+        keys = keys[:limit]
+        next_cursor = encode_cursor(*keys[-1])
+
+    ids = [ticket_id for _, ticket_id in keys]
+    # Page fingerprint: ids (membership + order), next_cursor aur SUM(version). Version sirf badhta hai, toh page ke kisi bhi
+    # ticket ka koi bhi change sum badal deta hai. Ye ek PK lookup aggregate hai, attachments/logs load nahi hote.
+    version_sum = db.query(func.coalesce(func.sum(Ticket.version), 0)).filter(Ticket.id.in_(ids)).scalar() if ids else 0
+    fingerprint = hashlib.sha256(f"{ids}|{version_sum}|{next_cursor}".encode()).hexdigest()[:32]
+    etag = f'W/"{fingerprint}"'  # Weak: same data, serialization byte-for-byte same ho zaroori nahi.
+    if not_modified(request, etag, None):
+        return Response(status_code=304, headers={"etag": etag, "cache-control": REVALIDATE})  # Dashboard poll: body/hydration skip.
+    response.headers["etag"] = etag
+    response.headers["cache-control"] = REVALIDATE
+
+    # Phase 2: sirf is page ke tickets primary key se load (attachments/logs ke saath), aur phase 1 ka order wapas lagaya.
+    by_id = {ticket.id: ticket for ticket in ticket_query(db).filter(Ticket.id.in_(ids))} if ids else {}
+    return {"items": [by_id[ticket_id] for ticket_id in ids if ticket_id in by_id], "next_cursor": next_cursor}
+
+@router.get("/search", response_model=TicketPage)  # Search endpoint. `/{ticket_id}` se pehle hona chahiye warna "search" id ban jayega.
+@db_endpoint
+def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200),  # Search text. Postgres pe websearch syntax ("exact phrase", -word) bhi chalta hai.
+    cursor: Optional[str] = None,  # Pichle page ka `next_cursor`.
+    limit: int = Query(50, ge=1, le=100),
+    current_user = Depends(get_current_user_or_admin),
+    db: Session = Depends(get_read_db)  # Read-only: replica pe (configured ho toh).
+):
+    """
+    Search ticket descriptions.
+    Postgres ranks matches by relevance using the GIN-indexed tsvector; SQLite falls back to LIKE, newest first.
+    Users only search their own tickets; admins search all of them.
+    """
+    query = ticket_query(db)
+    if not getattr(current_user, "is_admin_user", False):
+        query = query.filter(Ticket.user_id == current_user.id)  # User sirf apne tickets mein search kare.
+    try:
+        tickets, next_cursor = ticket_search.search_tickets(db, query, q, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": tickets, "next_cursor": next_cursor}
+
+@router.get("/events")  # Live updates (Server-Sent Events). `/{ticket_id}` se pehle.
+async def ticket_events(
+    current_user = Depends(get_stream_principal),
+    token: str = Depends(get_stream_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream ticket-created, status-changed and assignment-changed events as Server-Sent Events.
+    Admins receive every event; users only events for their own tickets.
+    Browsers can pass the token as `?token=` because EventSource cannot set headers.
+    The stream closes when the token expires or the principal is deactivated (checked every heartbeat).
+    """
+    # Auth ho gaya, ab stream ke poore time connection pakad ke baithne ki zaroorat nahi. Pool mein wapas.
+    await release_db(db)
+    subscription = events.bus.subscribe(events.visible_to(current_user))
+    return StreamingResponse(
+        events.sse_stream(
+            subscription,
+            settings.EVENT_STREAM_HEARTBEAT_SECONDS,
+            expires_at=token_expiry(token),
+            still_allowed=lambda: principal_still_active(token, db),  # Same session reuse: close ke baad naya transaction.
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # Nginx buffering band, event turant client tak.
+    )
+
+CLAIM_ATTEMPTS = 5  # SQLite fallback: candidate kisi aur ne le liya toh agla try, itni baar tak.
+
+def claim_pending_ticket(db: Session, admin_id: int):
+    """
+    Atomically move the oldest claimable pending ticket to In Progress and assign it to `admin_id`.
+    Claimable: pending and unassigned, or already assigned to this admin. Returns (id, user_id,
+    old assigned_admin_id) or None when the queue is empty. Caller writes logs/events and commits.
+    """
+    claimable = (
+        Ticket.status == TicketStatus.PENDING,
+        or_(Ticket.assigned_admin_id.is_(None), Ticket.assigned_admin_id == admin_id),
+    )
+    oldest = (Ticket.created_at, Ticket.id)  # ix_tickets_status_created_at_id se pehla pending row seedha milta hai.
+    values = {
+        "status": TicketStatus.IN_PROGRESS, "assigned_admin_id": admin_id,
+        "updated_at": func.now(), "version": Ticket.version + 1,
+    }
+    candidates = select(Ticket.id, Ticket.user_id, Ticket.assigned_admin_id).where(*claimable).order_by(*oldest).limit(1)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Ek statement: FOR UPDATE SKIP LOCKED wala CTE pehla *unlocked* pending row uthata hai, UPDATE usi ko claim karta hai.
+        # Doosre admins locked row pe wait nahi karte, agla row le lete hain. Isliye dozens of admins bina contention ke.
+        picked = candidates.with_for_update(skip_locked=True).cte("picked")
+        return db.execute(
+            update(Ticket).where(Ticket.id == picked.c.id).values(**values)
+            .returning(Ticket.id, picked.c.user_id, picked.c.assigned_admin_id),
+            execution_options={"synchronize_session": False},
+        ).first()
+
+    # SQLite (single writer): SKIP LOCKED nahi hai. Candidate padho, phir conditional UPDATE jo tabhi lagta hai
+    # jab row abhi bhi wahi state mein ho. Writes serialize hote hain, toh ek ticket do admins ko kabhi nahi milta.
+    for _ in range(CLAIM_ATTEMPTS):
+        candidate = db.execute(candidates).first()
+        if candidate is None:
+            return None
+        same_assignee = (
+            Ticket.assigned_admin_id.is_(None) if candidate.assigned_admin_id is None
+            else Ticket.assigned_admin_id == candidate.assigned_admin_id
+        )
+        claimed = db.execute(
+            update(Ticket).where(Ticket.id == candidate.id, Ticket.status == TicketStatus.PENDING, same_assignee).values(**values),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        if claimed:
+            return candidate
+    return None
+
+@router.post("/claim-next", response_model=TicketResponse)  # Work queue: agla pending ticket apne naam.
+@db_endpoint
+def claim_next_ticket(
+    current_admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Claim the oldest pending ticket: assign it to the caller and set it In Progress in one atomic step.
+    Concurrent callers always get different tickets. 204 when nothing is waiting.
+    """
+    if current_admin.role == AdminRole.JUNIOR:  # update_ticket jaisa hi rule.
+        raise HTTPException(status_code=403, detail="Junior Admins cannot update tickets.")
+
+    claimed = claim_pending_ticket(db, current_admin.id)
+    if claimed is None:
+        db.rollback()
+        return Response(status_code=204)
+    ticket_id, owner_id, old_admin_id = claimed
+
+    db.add(TicketStatusLog(
+        ticket_id=ticket_id, old_status=TicketStatus.PENDING, new_status=TicketStatus.IN_PROGRESS,
+        changed_by_admin_id=current_admin.id,
+    ))
+    events.queue_event(db, events.TicketEvent(
+        type=events.TICKET_STATUS_CHANGED, ticket_id=ticket_id, owner_id=owner_id,
+        assigned_admin_id=old_admin_id,  # update_ticket jaisa order: pehle status (purane admin pe), phir assignment.
+        data={"old_status": TicketStatus.PENDING.value, "new_status": TicketStatus.IN_PROGRESS.value, "changed_by_admin_id": current_admin.id},
+    ))
+    if old_admin_id != current_admin.id:
+        events.queue_event(db, events.TicketEvent(
+            type=events.TICKET_ASSIGNMENT_CHANGED, ticket_id=ticket_id, owner_id=owner_id,
+            assigned_admin_id=current_admin.id,
+            data={"old_admin_id": old_admin_id, "new_admin_id": current_admin.id, "status": TicketStatus.IN_PROGRESS.value, "changed_by_admin_id": current_admin.id},
+        ))
+    ticket_stats.record_ticket_change(db, TicketStatus.PENDING, old_admin_id, TicketStatus.IN_PROGRESS, current_admin.id)
+    db.commit()
+    return load_ticket(db, ticket_id)
 
 @router.get("/{ticket_id}", response_model=TicketResponse)  # Single ticket detail endpoint.
+@db_endpoint
 def read_ticket(
     ticket_id: int,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user_or_admin),
     db: Session = Depends(get_db)
 ):
     """
     Get specific ticket.
     - Admin: Autosets status to 'In Progress' if 'Pending'.
+    Sends ETag and Last-Modified; a matching If-None-Match / If-Modified-Since gets 304 without loading the ticket graph.
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()  # Fetch ticket.
-    if not ticket:
+    # Pehle sirf ek halki row: access check, ETag aur Last-Modified ke liye. Attachments/logs abhi load nahi.
+    last_log_at = (
+        select(func.max(TicketStatusLog.timestamp))
+        .where(TicketStatusLog.ticket_id == Ticket.id)  # Index: ix_ticket_status_logs_ticket_id_timestamp_id.
+        .scalar_subquery()
+    )
+    head = (
+        db.query(Ticket.id, Ticket.user_id, Ticket.status, Ticket.version, Ticket.created_at, Ticket.updated_at, last_log_at.label("last_log_at"))
+        .filter(Ticket.id == ticket_id)
+        .first()
+    )
+    if not head:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
     is_admin = getattr(current_user, "is_admin_user", False)  # Check role.
 
     # Access Check
     if not is_admin:
-        if ticket.user_id != current_user.id:  # Agar user kisi aur ka ticket dekhne ki koshish kare toh block.
+        if head.user_id != current_user.id:  # Agar user kisi aur ka ticket dekhne ki koshish kare toh block.
             raise HTTPException(status_code=403, detail="Not authorized to view this ticket")
-    
+
+    auto_open = is_admin and head.status == TicketStatus.PENDING
+    if not auto_open:  # Auto-open ticket badalta hai, us case mein 304 ka sawaal hi nahi.
+        etag = ticket_etag(head)
+        last_modified = max(value for value in (head.created_at, head.updated_at, head.last_log_at) if value is not None)
+        headers = {"etag": etag, "last-modified": http_date(last_modified), "cache-control": REVALIDATE}
+        if not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)  # Poll pe kuch nahi badla: na graph load, na serialization.
+        response.headers.update(headers)
+
+    ticket = ticket_query(db).filter(Ticket.id == ticket_id).first()  # Fetch ticket (attachments/logs ke saath).
+    if not ticket:  # Beech mein hi delete ho gaya.
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
     # Admin Logic: Auto Open
     # Ye automation requirement hai: Admin open karte hi wo 'In Progress' ho jana chahiye.
-    if is_admin:
+    if auto_open:
         # "When an admin opens a ticket, automatically set status to In Progress"
         if ticket.status == TicketStatus.PENDING:
-            log_status_change(db, ticket, TicketStatus.IN_PROGRESS, current_user.id)  # Log change.
-            ticket.status = TicketStatus.IN_PROGRESS  # Update status.
+            # Conditional UPDATE: do admins ek saath kholein toh sirf ek ka UPDATE row badalta hai (doosre ko 0 rows),
+            # isliye log/counter/event bhi ek hi baar. Pehle read-check-write mein dono log likh dete the.
+            opened = db.execute(
+                update(Ticket)
+                .where(Ticket.id == ticket.id, Ticket.status == TicketStatus.PENDING)
+                .values(status=TicketStatus.IN_PROGRESS, updated_at=func.now(), version=Ticket.version + 1),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            if opened:
+                log_status_change(db, ticket, TicketStatus.IN_PROGRESS, current_user.id)  # Log change.
+                ticket_stats.record_ticket_change(
+                    db, ticket.status, ticket.assigned_admin_id, TicketStatus.IN_PROGRESS, ticket.assigned_admin_id
+                )  # Pending -> In Progress counter move.
             db.commit()
-            db.refresh(ticket)
-            
+            ticket = load_ticket(db, ticket.id)  # Naya log bhi response mein chahiye, isliye relationships ke saath reload.
+        response.headers["etag"] = ticket_etag(ticket)  # PUT ke If-Match ke liye.
+        response.headers["cache-control"] = REVALIDATE
+
     return ticket
 
 @router.put("/{ticket_id}", response_model=TicketResponse)  # Update ticket endpoint.
+@db_endpoint
 def update_ticket(
     ticket_id: int,
     ticket_update: TicketUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),  # GET wala ETag. Diya hai aur ticket tab se badal gaya toh 412.
     current_admin: Admin = Depends(get_current_admin), # Only admins update tickets. User edit nahi kar sakta raise karne ke baad.
     db: Session = Depends(get_db)
 ):
@@ -172,6 +534,9 @@ def update_ticket(
     ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    if not if_match_satisfied(if_match, ticket_etag(ticket)):  # Client ne purana version dekh ke edit kiya tha.
+        raise HTTPException(status_code=412, detail=TICKET_CONFLICT_DETAIL)
+    old_status, old_admin_id = ticket.status, ticket.assigned_admin_id  # Counters update ke liye purani state yaad rakhi.
 
     # Update Status
     if ticket_update.status:
@@ -199,7 +564,176 @@ def update_ticket(
         # Maybe restrict assignment changes to Senior?
         # Or Sub admin can pick it up.
         ticket.assigned_admin_id = ticket_update.assigned_admin_id  # Assignee change kar rahe hain.
+        if ticket.assigned_admin_id != old_admin_id:
+            events.queue_event(db, events.TicketEvent(
+                type=events.TICKET_ASSIGNMENT_CHANGED,
+                ticket_id=ticket.id,
+                owner_id=ticket.user_id,
+                assigned_admin_id=ticket.assigned_admin_id,
+                data={"old_admin_id": old_admin_id, "new_admin_id": ticket.assigned_admin_id, "status": ticket.status.value, "changed_by_admin_id": current_admin.id},
+            ))
 
-    db.commit()
-    db.refresh(ticket)
+    ticket_stats.record_ticket_change(db, old_status, old_admin_id, ticket.status, ticket.assigned_admin_id)
+    try:
+        db.commit()  # UPDATE ... WHERE id = :id AND version = :v (mapper version_id_col).
+    except StaleDataError:
+        # Padhne ke baad kisi aur ne ticket badal diya. Log, counters aur queued events sab isi rollback mein gaye.
+        db.rollback()
+        raise HTTPException(status_code=412, detail=TICKET_CONFLICT_DETAIL)
+    ticket = load_ticket(db, ticket.id)  # Relationships ke saath reload.
+    response.headers["ETag"] = ticket_etag(ticket)
     return ticket
+
+@router.patch("/bulk", response_model=TicketBulkResult)  # Bulk update endpoint (triage).
+@db_endpoint
+def bulk_update_tickets(
+    bulk_update: TicketBulkUpdate,
+    current_admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply one status / assignment / hold reason change to many tickets, chosen by `ids` or `filter`.
+    Same role rules as `update_ticket`. Runs as one transaction: one locking SELECT, one UPDATE,
+    one multi-row INSERT for the status logs. Returns a result per ticket id.
+    """
+    if current_admin.role == AdminRole.JUNIOR:  # update_ticket jaisa hi rule.
+        raise HTTPException(status_code=403, detail="Junior Admins cannot update tickets.")
+    if (bulk_update.ids is None) == (bulk_update.filter is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of ids or filter")
+    if bulk_update.status is None and bulk_update.assigned_admin_id is None and not bulk_update.hold_reason:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    # Ek SELECT mein saare target rows ki purani state. Postgres pe FOR UPDATE, taaki logs/counters ke liye
+    # padhi gayi state aur UPDATE ke beech koi aur request in rows ko na badle.
+    query = db.query(Ticket.id, Ticket.user_id, Ticket.status, Ticket.assigned_admin_id, Ticket.hold_reason)
+    limit = settings.BULK_UPDATE_MAX_TICKETS
+    if bulk_update.ids is not None:
+        requested_ids = list(dict.fromkeys(bulk_update.ids))  # Duplicate ids hataye, order same rakha.
+        query = query.filter(Ticket.id.in_(requested_ids)) if requested_ids else None
+    else:
+        bulk_filter = bulk_update.filter
+        if bulk_filter.unassigned and bulk_filter.assigned_admin_id is not None:
+            raise HTTPException(status_code=400, detail="Use only one of assigned_admin_id or unassigned")
+        if bulk_filter.status:
+            query = query.filter(Ticket.status.in_(bulk_filter.status))
+        if bulk_filter.unassigned:
+            query = query.filter(Ticket.assigned_admin_id.is_(None))
+        elif bulk_filter.assigned_admin_id is not None:
+            query = query.filter(Ticket.assigned_admin_id == bulk_filter.assigned_admin_id)
+        query = query.order_by(Ticket.id).limit(limit + 1)
+    rows = query.with_for_update().all() if query is not None else []
+    if bulk_update.ids is None:
+        if len(rows) > limit:
+            raise HTTPException(status_code=400, detail=f"Filter matches more than {limit} tickets. Narrow it down.")
+        requested_ids = [row.id for row in rows]
+
+    by_id = {row.id: row for row in rows}
+    results, targets = [], []
+    for ticket_id in requested_ids:
+        row = by_id.get(ticket_id)
+        if row is None:
+            results.append({"id": ticket_id, "ok": False, "detail": "Ticket not found"})
+        elif bulk_update.status == TicketStatus.ON_HOLD and not bulk_update.hold_reason and not row.hold_reason:
+            results.append({"id": ticket_id, "ok": False, "detail": "Hold reason is required when putting on hold."})
+        else:
+            results.append({"id": ticket_id, "ok": True})
+            targets.append(row)
+
+    if targets:
+        values = {"updated_at": func.now(), "version": Ticket.version + 1}  # Version bump, taaki purane If-Match 412 dein.
+        if bulk_update.status:
+            values["status"] = bulk_update.status
+        if bulk_update.hold_reason:
+            values["hold_reason"] = bulk_update.hold_reason
+        if bulk_update.assigned_admin_id is not None:
+            values["assigned_admin_id"] = bulk_update.assigned_admin_id
+        # Ek set-based UPDATE, N round trips ki jagah.
+        db.execute(
+            update(Ticket).where(Ticket.id.in_([row.id for row in targets])).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+
+        logs, changes = [], []
+        for row in targets:
+            new_status = bulk_update.status or row.status
+            new_admin_id = bulk_update.assigned_admin_id if bulk_update.assigned_admin_id is not None else row.assigned_admin_id
+            changes.append((row.status, row.assigned_admin_id, new_status, new_admin_id))
+            if new_status != row.status:  # log_status_change wala hi rule: status badla tabhi log.
+                logs.append({
+                    "ticket_id": row.id, "old_status": row.status, "new_status": new_status,
+                    "changed_by_admin_id": current_admin.id,
+                })
+                events.queue_event(db, events.TicketEvent(
+                    type=events.TICKET_STATUS_CHANGED, ticket_id=row.id, owner_id=row.user_id,
+                    assigned_admin_id=row.assigned_admin_id,  # update_ticket jaisa order: pehle status (purane admin pe), phir assignment.
+                    data={"old_status": row.status.value if row.status else None, "new_status": new_status.value, "changed_by_admin_id": current_admin.id},
+                ))
+            if new_admin_id != row.assigned_admin_id:
+                events.queue_event(db, events.TicketEvent(
+                    type=events.TICKET_ASSIGNMENT_CHANGED, ticket_id=row.id, owner_id=row.user_id,
+                    assigned_admin_id=new_admin_id,
+                    data={"old_admin_id": row.assigned_admin_id, "new_admin_id": new_admin_id, "status": new_status.value, "changed_by_admin_id": current_admin.id},
+                ))
+        if logs:
+            db.execute(insert(TicketStatusLog).values(logs))  # Saare logs ek multi-row INSERT mein.
+        ticket_stats.record_ticket_changes(db, changes)  # Counters bucket-wise net delta se.
+
+    db.commit()
+    return {"updated": len(targets), "results": results}
+
+@router.get("/{ticket_id}/attachments/{attachment_id}")  # Authenticated attachment download.
+@db_endpoint
+def download_attachment(
+    ticket_id: int,
+    attachment_id: int,
+    request: Request,
+    current_user = Depends(get_current_user_or_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Download an attachment.
+    - User: only attachments on their own tickets. Admin: any.
+    Supports Range/If-Range (resumable downloads), a strong ETag from the content hash
+    and If-None-Match -> 304.
+    """
+    row = (
+        db.query(Attachment, Ticket.user_id)
+        .join(Ticket, Ticket.id == Attachment.ticket_id)
+        .filter(Attachment.id == attachment_id, Attachment.ticket_id == ticket_id)
+        .first()
+    )  # Ek query mein attachment aur uske ticket ka owner dono.
+    if not row:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    attachment, owner_id = row
+
+    if not getattr(current_user, "is_admin_user", False) and owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this attachment")
+
+    headers = {}
+    if attachment.content_hash:
+        # Content-addressed blob kabhi badalta nahi: hash hi strong ETag hai aur browser ise hamesha ke liye cache kar sakta hai.
+        etag = f'"{attachment.content_hash}"'
+        headers["etag"] = etag
+        headers["cache-control"] = "private, max-age=31536000, immutable"
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)  # Browser ke paas same copy hai, body bhejne ki zaroorat nahi.
+    else:
+        headers["cache-control"] = "private, no-cache"  # Legacy files: FileResponse mtime/size wala ETag lagayega, har baar revalidate.
+
+    if not os.path.isfile(attachment.file_path):
+        raise HTTPException(status_code=404, detail="Attachment file missing")
+
+    if settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX:
+        # Nginx internal redirect: auth yahan hua, bytes nginx sendfile se bhejega (Range bhi wahi handle karta hai).
+        relative_path = os.path.relpath(attachment.file_path, UPLOAD_DIR).replace(os.sep, "/")
+        headers["x-accel-redirect"] = settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative_path
+        headers["content-disposition"] = f"attachment; filename*=utf-8''{quote(attachment.filename)}"
+        return Response(status_code=200, headers=headers, media_type=attachment.file_type)
+
+    # FileResponse khud Range/If-Range handle karta hai, aur server support kare toh pathsend (zero-copy) use karta hai.
+    return FileResponse(
+        attachment.file_path,
+        media_type=attachment.file_type or "application/octet-stream",
+        filename=attachment.filename,  # Content-Disposition: attachment, taaki uploaded HTML browser mein execute na ho.
+        headers=headers,
+    )
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException  # FastAPI routing tools.
 from sqlalchemy.orm import Session  # DB connectivity.
 from typing import List  # Type hints.
 
-from app.db.session import get_db  # dependency.
+from app.db.session import get_db, run_db  # dependency + sync/async DB mode helper.
 from app.models.user import User, Admin  # ORM models.
 from app.schemas.user import UserCreate, UserResponse  # Pydantic Schemas.
 from app.core import security  # Password hashing.
@@ -14,7 +14,7 @@ from app.routers.deps import get_current_admin  # Dependency to ensure only admi
 router = APIRouter()  # Router initialization.
 
 @router.post("/", response_model=UserResponse)  # POST endpoint user create karne ke liye.
-def create_user(
+async def create_user(
     user_in: UserCreate,  # Body se data lega UserCreate schema ke hisaab se.
     db: Session = Depends(get_db),  # Database session.
     current_admin: Admin = Depends(get_current_admin)  # Authorization check: Sirf Admin hi call kar sakta hai.
@@ -23,6 +23,11 @@ def create_user(
     Create a new user. Only Admins can invoke this.
     User account is active by default as it is created by Admin.
     """
+    # Password hash karna CPU heavy hai, isliye bounded password pool pe bhej rahe hain.
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    return await run_db(db, _insert_user, user_in, hashed_password)
+
+def _insert_user(db: Session, user_in: UserCreate, hashed_password: str):
     # Check kar rahe hain ki email pehle se registered toh nahi.
     user = db.query(User).filter(User.email == user_in.email).first()
     if user:  # Check duplicate.
@@ -34,7 +39,7 @@ def create_user(
     # User object create kar rahe hain.
     user_obj = User(
         email=user_in.email,  # Email assign.
-        hashed_password=security.get_password_hash(user_in.password),  # Password hash kar rahe hain security ke liye.
+        hashed_password=hashed_password,  # Password pehle hi hash ho chuka hai.
         full_name=user_in.full_name,  # Full name.
         is_active=True  # Direct active kar rahe hain kyunki admin bana raha hai (trusted source).
     )
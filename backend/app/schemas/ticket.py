@@ -1,6 +1,7 @@
-from pydantic import BaseModel  # Pydantic base model import kar rahe validation ke liye.
+from pydantic import BaseModel, field_validator  # Pydantic base model import kar rahe validation ke liye.
 from typing import Optional, List  # Type hints import. List use hoga multiple attachments dikhane ke liye.
 from datetime import datetime  # Date time handling ke liye.
+from app.core.config import settings  # Bulk update ki limit.
 from app.models.enums import TicketStatus  # Enum import validation ke liye taaki status valid hi ho.
 
 # --- Attachment Schemas ---
@@ -9,6 +10,7 @@ class AttachmentResponse(BaseModel):  # File details return karne ke liye schema
     id: int  # Unique ID.
     filename: str  # Original file name.
     file_type: Optional[str]  # MIME type option hai.
+    size_bytes: Optional[int] = None  # File size. Purane attachments ke liye None.
     created_at: datetime  # Kab upload hui.
 
     class Config:  # Pydantic config.
@@ -30,6 +32,42 @@ class TicketUpdate(BaseModel):  # Ticket update karne ke liye schema. Saare fiel
     # For assigning (Senior Admin)
     assigned_admin_id: Optional[int] = None  # Ticket re-assign karne ke liye.
 
+class TicketBulkFilter(BaseModel):  # Bulk update ke target ids ki jagah filter.
+    status: Optional[List[TicketStatus]] = None  # In statuses wale tickets.
+    assigned_admin_id: Optional[int] = None  # Is admin ke tickets.
+    unassigned: bool = False  # Sirf unassigned tickets.
+
+class TicketBulkUpdate(TicketUpdate):  # Ek saath kai tickets pe same change. `ids` ya `filter` me se ek dena hai.
+    ids: Optional[List[int]] = None  # Explicit ticket ids.
+    filter: Optional[TicketBulkFilter] = None  # Ya phir filter se target chuno.
+
+    @field_validator("ids")
+    @classmethod
+    def ids_within_limit(cls, ids: Optional[List[int]]) -> Optional[List[int]]:
+        # Limit settings se hi, taaki BULK_UPDATE_MAX_TICKETS badle toh schema bhi wahi maane (422).
+        if ids is not None and len(ids) > settings.BULK_UPDATE_MAX_TICKETS:
+            raise ValueError(f"At most {settings.BULK_UPDATE_MAX_TICKETS} ids per request")
+        return ids
+
+class TicketBulkItemResult(BaseModel):  # Har ticket ka result.
+    id: int
+    ok: bool
+    detail: Optional[str] = None  # Fail hone ka reason (not found, hold reason missing...).
+
+class TicketBulkResult(BaseModel):
+    updated: int  # Kitne tickets actually update hue.
+    results: List[TicketBulkItemResult] = []
+
+class TicketStatusLogResponse(BaseModel):  # Logs dikhane ke liye schema.
+    id: int
+    old_status: Optional[TicketStatus]  # Purana status.
+    new_status: TicketStatus  # Naya status.
+    timestamp: datetime  # Kab change hua.
+    changed_by_admin_id: Optional[int]  # Kis admin ne change kiya.
+
+    class Config:
+        from_attributes = True  # ORM serialization enable.
+
 class TicketResponse(TicketBase):  # Ticket details return karne ke liye schema.
     id: int  # Ticket ID.
     user_id: int  # User jisne banaya.
@@ -37,6 +75,7 @@ class TicketResponse(TicketBase):  # Ticket details return karne ke liye schema.
     created_at: datetime  # Creation timestamp.
     hold_reason: Optional[str]  # Hold reason agar hai toh.
     assigned_admin_id: Optional[int]  # Assigned admin ID.
+    version: int = 1  # Har change pe badhta hai. PUT ke `If-Match` mein yahi (ETag ke roop mein) wapas bhejna hai.
     
     attachments: List[AttachmentResponse] = []  # Nested object list attachments ke liye. Ye powerful feature hai Pydantic ka.
     status_logs: List[TicketStatusLogResponse] = []
@@ -44,12 +83,6 @@ class TicketResponse(TicketBase):  # Ticket details return karne ke liye schema.
     class Config:
         from_attributes = True  # ORM serialization enable.
 
-class TicketStatusLogResponse(BaseModel):  # Logs dikhane ke liye schema.
-    id: int
-    old_status: Optional[TicketStatus]  # Purana status.
-    new_status: TicketStatus  # Naya status.
-    timestamp: datetime  # Kab change hua.
-    changed_by_admin_id: Optional[int]  # Kis admin ne change kiya.
-
-    class Config:
-        from_attributes = True  # ORM serialization enable.
+class TicketPage(BaseModel):  # Keyset pagination wala list response. Items ke saath agle page ka cursor bhi milta hai.
+    items: List[TicketResponse] = []  # Current page ke tickets.
+    next_cursor: Optional[str] = None  # Agla page lene ke liye opaque cursor. None matlab aur data nahi hai.
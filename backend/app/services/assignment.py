@@ -0,0 +1,218 @@
+import heapq  # Least-loaded admin O(log n) mein nikalne ke liye.
+import itertools  # Heap entries ka tie-break sequence.
+import threading  # Decisions threadpool threads se aate hain.
+import time  # Periodic resync.
+from collections import OrderedDict, deque  # Sticky map (LRU) aur round-robin ring.
+from typing import Dict, List, Optional, Tuple  # Type hints.
+
+from sqlalchemy import func  # Open tickets per admin.
+from sqlalchemy.orm import Session  # DB session type.
+
+from app.core.config import settings  # Strategy aur resync interval.
+from app.models.enums import AdminRole, TicketStatus  # Eligible roles aur open statuses.
+from app.models.ticket import Ticket  # Warm-up ke liye.
+from app.models.user import Admin  # Eligible admins.
+from app.services import events  # Load index ko ticket changes ke saath update rakhne ke liye.
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+STICKY = "sticky"
+STRATEGIES = (ROUND_ROBIN, LEAST_LOADED, STICKY)
+
+ELIGIBLE_ROLES = (AdminRole.SUB, AdminRole.SENIOR)  # Junior admin sirf dekh sakte hain, unhe tickets assign nahi hote.
+OPEN_STATUSES = (TicketStatus.PENDING, TicketStatus.IN_PROGRESS, TicketStatus.ON_HOLD)  # Resolved load mein nahi ginte.
+STICKY_MAX_USERS = 50000  # User -> admin map ki LRU limit.
+
+
+class AssignmentEngine:
+    """
+    Picks an admin for a new ticket from an in-memory load index (open tickets per eligible admin).
+    - round_robin: rotate through eligible admins, O(1).
+    - least_loaded: min-heap with lazy invalidation, O(log n).
+    - sticky: the user's previous admin if still eligible, otherwise least_loaded.
+    The index is warmed with one grouped query, then kept current from ticket events; it never scans
+    `tickets` per decision. Each worker holds its own index, so it is resynced every AUTO_ASSIGN_RESYNC_SECONDS.
+    """
+
+    def __init__(self, strategy: str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy: {strategy}")
+        self.strategy = strategy
+        self._lock = threading.Lock()
+        self._load: Dict[int, int] = {}  # Sirf eligible admins. Key nahi hai matlab admin eligible nahi.
+        self._reserved: Dict[int, int] = {}  # admin_id -> `choose` ke reservations jinka ticket abhi commit nahi hua.
+        self._heap: List[Tuple[int, int, int]] = []  # (load, seq, admin_id). Purani entries pop ke waqt skip.
+        self._seq = itertools.count()
+        self._ring: deque = deque()  # Round-robin order.
+        self._sticky: "OrderedDict[int, int]" = OrderedDict()  # user_id -> last admin_id.
+        self._loaded_at: Optional[float] = None
+        self.decisions = 0
+
+    # --- Index maintenance (lock held by callers) ---
+
+    def _push(self, admin_id: int) -> None:
+        heapq.heappush(self._heap, (self._load[admin_id], next(self._seq), admin_id))
+        if len(self._heap) > 4 * len(self._load) + 64:  # Stale entries bahut ho gayi, heap dobara bana do.
+            self._heap = [(load, next(self._seq), admin_id) for admin_id, load in self._load.items()]
+            heapq.heapify(self._heap)
+
+    def _adjust(self, admin_id: Optional[int], delta: int) -> None:
+        if admin_id is None or admin_id not in self._load:  # Unassigned ya non-eligible admin: index mein nahi.
+            return
+        self._load[admin_id] = max(self._load[admin_id] + delta, 0)
+        self._push(admin_id)
+
+    def _settle(self, admin_id: Optional[int]) -> None:
+        """Reservation khatam: ticket commit hua (ab DB count mein hai) ya release hua."""
+        remaining = self._reserved.get(admin_id, 0) - 1
+        if remaining > 0:
+            self._reserved[admin_id] = remaining
+        else:
+            self._reserved.pop(admin_id, None)
+
+    def _least_loaded(self) -> Optional[int]:
+        while self._heap:
+            load, _, admin_id = self._heap[0]
+            if self._load.get(admin_id) == load:  # Entry current hai.
+                return admin_id
+            heapq.heappop(self._heap)  # Stale (load badal gaya ya admin hat gaya), hata do.
+        return None
+
+    def _round_robin(self) -> Optional[int]:
+        while self._ring:
+            admin_id = self._ring[0]
+            self._ring.rotate(-1)
+            if admin_id in self._load:
+                return admin_id
+            self._ring.remove(admin_id)  # Admin ab eligible nahi.
+        return None
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index from the admins table and one grouped count of open tickets."""
+        admins = (
+            db.query(Admin.id)
+            .filter(Admin.is_active.is_(True), Admin.role.in_(ELIGIBLE_ROLES))
+            .order_by(Admin.id)
+            .all()
+        )
+        # Index ix_tickets_assigned_admin_id_status_created_at_id se ye count index-only chal sakta hai.
+        counts = dict(
+            db.query(Ticket.assigned_admin_id, func.count(Ticket.id))
+            .filter(Ticket.assigned_admin_id.isnot(None), Ticket.status.in_(OPEN_STATUSES))
+            .group_by(Ticket.assigned_admin_id)
+            .all()
+        )
+        with self._lock:
+            # DB sirf committed tickets ginta hai. In-flight reservations wapas jodte hain, warna unka load
+            # kho jata: commit pe TICKET_CREATED `auto_assigned` dekh ke increment skip karta hai.
+            self._load = {
+                admin_id: counts.get(admin_id, 0) + self._reserved.get(admin_id, 0) for (admin_id,) in admins
+            }
+            self._heap = [(load, next(self._seq), admin_id) for admin_id, load in self._load.items()]
+            heapq.heapify(self._heap)
+            self._ring = deque(self._load)
+            self._loaded_at = time.monotonic()
+
+    def _needs_load(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        interval = settings.AUTO_ASSIGN_RESYNC_SECONDS
+        return bool(interval) and time.monotonic() - self._loaded_at > interval
+
+    # --- Decisions ---
+
+    def choose(self, db: Session, user_id: int) -> Optional[int]:
+        """
+        Pick an admin for a new ticket raised by `user_id` and reserve one unit of load for it.
+        Returns None when no admin is eligible. Call `release` if the ticket is not committed.
+        """
+        if self._needs_load():
+            self.load(db)
+        with self._lock:
+            admin_id = None
+            if self.strategy == STICKY:
+                previous = self._sticky.get(user_id)
+                if previous in self._load:
+                    admin_id = previous
+            if admin_id is None:
+                admin_id = self._round_robin() if self.strategy == ROUND_ROBIN else self._least_loaded()
+            if admin_id is None:
+                return None
+            self._adjust(admin_id, 1)  # Commit se pehle hi reserve, taaki burst mein sab ek hi admin pe na jayein.
+            self._reserved[admin_id] = self._reserved.get(admin_id, 0) + 1
+            self._remember(user_id, admin_id)
+            self.decisions += 1
+            return admin_id
+
+    def release(self, admin_id: Optional[int]) -> None:
+        """Undo the reservation made by `choose` (the ticket insert failed)."""
+        with self._lock:
+            self._adjust(admin_id, -1)
+            self._settle(admin_id)
+
+    def _remember(self, user_id: int, admin_id: int) -> None:
+        self._sticky[user_id] = admin_id
+        self._sticky.move_to_end(user_id)
+        if len(self._sticky) > STICKY_MAX_USERS:
+            self._sticky.popitem(last=False)
+
+    # --- Keeping the index current ---
+
+    def on_ticket_event(self, ticket_event: events.TicketEvent) -> None:
+        """Bus listener: apply a committed ticket change to the load index."""
+        data = ticket_event.data
+        with self._lock:
+            if ticket_event.type == events.TICKET_CREATED:
+                if data.get("auto_assigned"):  # `choose` mein pehle hi gina ja chuka hai; reservation ab committed.
+                    self._settle(ticket_event.assigned_admin_id)
+                else:
+                    self._adjust(ticket_event.assigned_admin_id, 1)
+            elif ticket_event.type == events.TICKET_STATUS_CHANGED:
+                was_open = data.get("old_status") != TicketStatus.RESOLVED.value
+                is_open = data.get("new_status") != TicketStatus.RESOLVED.value
+                if was_open != is_open:  # Resolve hua (-1) ya reopen hua (+1).
+                    self._adjust(ticket_event.assigned_admin_id, 1 if is_open else -1)
+            elif ticket_event.type == events.TICKET_ASSIGNMENT_CHANGED:
+                if data.get("status") != TicketStatus.RESOLVED.value:  # Sirf open ticket load move karta hai.
+                    self._adjust(data.get("old_admin_id"), -1)
+                    self._adjust(data.get("new_admin_id"), 1)
+                if data.get("new_admin_id") is not None:
+                    self._remember(ticket_event.owner_id, data["new_admin_id"])
+
+    def admin_updated(self, admin_id: int, role: AdminRole, is_active: bool) -> None:
+        """Add or drop an admin from the eligible set after create/approve/deactivate."""
+        with self._lock:
+            if self._loaded_at is None:  # Abhi tak load hi nahi hua, pehli decision pe sab load hoga.
+                return
+            eligible = is_active and role in ELIGIBLE_ROLES
+            if eligible and admin_id not in self._load:
+                # Naye admin ka load abhi 0 maana; agle resync pe exact ho jayega.
+                self._load[admin_id] = 0
+                self._push(admin_id)
+                self._ring.append(admin_id)
+            elif not eligible and admin_id in self._load:
+                del self._load[admin_id]  # Heap/ring entries lazily skip ho jayengi.
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "eligible_admins": len(self._load),
+                "load": [{"admin_id": admin_id, "open_tickets": load} for admin_id, load in sorted(self._load.items())],
+                "decisions": self.decisions,
+                "sticky_users": len(self._sticky),
+                "loaded_seconds_ago": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+            }
+
+
+# Process-wide engine. AUTO_ASSIGN_STRATEGY khali hai toh None: tickets pehle ki tarah unassigned bante hain.
+engine: Optional[AssignmentEngine] = None
+if settings.AUTO_ASSIGN_STRATEGY:
+    engine = AssignmentEngine(settings.AUTO_ASSIGN_STRATEGY)
+    events.bus.add_listener(engine.on_ticket_event)
+
+
+def admin_updated(admin_id: int, role: AdminRole, is_active: bool) -> None:
+    """Hook for admin create/approve paths; no-op while auto-assignment is off."""
+    if engine is not None:
+        engine.admin_updated(admin_id, role, is_active)
@@ -0,0 +1,198 @@
+import asyncio  # Subscriber queues event loop pe rehti hain.
+from abc import ABC, abstractmethod  # EventBus interface.
+import itertools  # Event ids ke liye counter.
+import json  # SSE data frames.
+import logging  # Listener errors log karne ke liye.
+import threading  # Publish threadpool threads se bhi hota hai.
+import time  # Token expiry wall clock pe.
+from dataclasses import dataclass, field  # Event payload.
+from datetime import datetime, timezone  # Event timestamp.
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set  # Type hints.
+
+from sqlalchemy import event as sa_event  # Commit hone ke baad hi events publish karne ke liye.
+from sqlalchemy.orm import Session  # Session events class level pe (sync aur AsyncSession dono cover).
+
+from app.core.config import settings  # Queue size aur heartbeat.
+
+logger = logging.getLogger(__name__)
+
+TICKET_CREATED = "ticket.created"
+TICKET_STATUS_CHANGED = "ticket.status_changed"
+TICKET_ASSIGNMENT_CHANGED = "ticket.assignment_changed"
+
+_PENDING_KEY = "pending_ticket_events"  # `session.info` mein commit ka wait karte events.
+_event_ids = itertools.count(1)
+
+
+@dataclass
+class TicketEvent:
+    """A committed change to a ticket, fanned out to subscribers and in-process listeners."""
+    type: str
+    ticket_id: int
+    owner_id: int  # Ticket raise karne wala user. User ko sirf apne tickets ke events milte hain.
+    assigned_admin_id: Optional[int] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    id: int = field(default_factory=lambda: next(_event_ids))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "ticket_id": self.ticket_id,
+            "owner_id": self.owner_id,
+            "assigned_admin_id": self.assigned_admin_id,
+            "data": self.data,
+            "at": self.at.isoformat(),
+        }
+
+
+class Subscription:
+    """One connected client: a bounded asyncio queue fed from any thread, plus a visibility filter."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, accepts: Callable[[TicketEvent], bool], max_size: int):
+        self.loop = loop
+        self.accepts = accepts
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def deliver(self, ticket_event: TicketEvent) -> None:
+        if self.accepts(ticket_event):
+            # Publish threadpool thread se bhi ho sakta hai, isliye queue ko sirf loop thread pe chhoo rahe hain.
+            self.loop.call_soon_threadsafe(self._put, ticket_event)
+
+    def _put(self, ticket_event: TicketEvent) -> None:
+        if self.queue.full():  # Slow client: sabse purana event gira do, server memory bounded rahe.
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(ticket_event)
+
+
+class EventBus(ABC):
+    """
+    Interface for ticket event fan-out. `InProcessEventBus` serves a single worker; a multi-worker
+    deployment can swap in a LISTEN/NOTIFY backed bus with the same methods.
+    """
+
+    @abstractmethod
+    def publish(self, ticket_event: TicketEvent) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, accepts: Callable[[TicketEvent], bool]) -> Subscription:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        ...
+
+    @abstractmethod
+    def add_listener(self, listener: Callable[[TicketEvent], None]) -> None:
+        ...
+
+
+class InProcessEventBus(EventBus):
+    def __init__(self, max_queue_size: int):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._listeners: List[Callable[[TicketEvent], None]] = []
+
+    def publish(self, ticket_event: TicketEvent) -> None:
+        # Sync listeners (e.g. in-memory indexes) pehle, inline. Ek listener fail ho toh baaki aur subscribers chalte rahein.
+        for listener in list(self._listeners):
+            try:
+                listener(ticket_event)
+            except Exception:
+                logger.exception("ticket event listener failed for %s", ticket_event.type)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.deliver(ticket_event)
+            except RuntimeError:  # Loop band ho chuka (shutdown), subscriber hata do.
+                self.unsubscribe(subscription)
+
+    def subscribe(self, accepts: Callable[[TicketEvent], bool]) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), accepts, self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def add_listener(self, listener: Callable[[TicketEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+# Process-wide bus. Har worker ka apna hai; multiple workers mein sab clients ko sab events chahiye toh yahi object swap karna hai.
+bus: EventBus = InProcessEventBus(max_queue_size=settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
+
+
+def queue_event(db: Session, ticket_event: TicketEvent) -> None:
+    """Attach an event to the session's transaction; it is published only if that transaction commits."""
+    db.info.setdefault(_PENDING_KEY, []).append(ticket_event)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for ticket_event in session.info.pop(_PENDING_KEY, []):
+        bus.publish(ticket_event)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)  # Rollback hua toh jo kabhi hua hi nahi uska event nahi jana chahiye.
+
+
+def visible_to(principal) -> Callable[[TicketEvent], bool]:
+    """Admins see every ticket event; users only events for tickets they raised."""
+    if getattr(principal, "is_admin_user", False):
+        return lambda ticket_event: True
+    return lambda ticket_event: ticket_event.owner_id == principal.id
+
+
+async def sse_stream(
+    subscription: Subscription,
+    heartbeat_seconds: float,
+    expires_at: Optional[float] = None,
+    still_allowed: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events frames for a subscription; a comment line is sent as heartbeat when idle.
+    Ends at `expires_at` (Unix time), or when `still_allowed`, awaited once per heartbeat interval, returns False.
+    """
+    loop = asyncio.get_running_loop()
+    next_check = loop.time() + heartbeat_seconds
+    try:
+        yield "retry: 3000\n\n"  # Connection toote toh browser 3s mein khud reconnect kare.
+        while True:
+            timeout = heartbeat_seconds
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:  # Token expire: stream band. Client naye token ke saath reconnect kare.
+                    return
+                timeout = min(timeout, remaining)
+            try:
+                ticket_event = await asyncio.wait_for(subscription.queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                ticket_event = None
+            if loop.time() >= next_check:
+                # Busy stream pe bhi har heartbeat interval mein ek baar: banned/deleted principal ko events milte na rahein.
+                next_check = loop.time() + heartbeat_seconds
+                if still_allowed is not None and not await still_allowed():
+                    return
+                if ticket_event is None:
+                    yield ": ping\n\n"  # Proxies idle connection band na karein.
+            if ticket_event is None:
+                continue
+            payload = json.dumps(ticket_event.to_dict(), separators=(",", ":"))
+            yield f"id: {ticket_event.id}\nevent: {ticket_event.type}\ndata: {payload}\n\n"
+    finally:
+        bus.unsubscribe(subscription)  # Client disconnect pe generator cancel hota hai, yahan cleanup.
@@ -0,0 +1,85 @@
+import csv  # CSV rows.
+import io  # Chunk buffer.
+import json  # NDJSON rows.
+from datetime import datetime  # Filters / serialization.
+from enum import Enum  # Status values.
+from typing import Iterator, List, Optional  # Type hints.
+
+from sqlalchemy import select, text  # Column-only selects aur statement timeout.
+
+from app.db.session import engine  # Dialect (datetime filters ke liye).
+from app.db.replicas import read_session  # Export apna sync session kholta hai, replica ho toh wahan (request session stream se pehle chhod diya jata hai).
+from app.models.enums import TicketStatus  # Status filter.
+from app.models.ticket import Ticket, TicketStatusLog  # Export tables.
+from app.utils.pagination import keyset_datetime  # SQLite pe datetime filters ka text compare.
+
+YIELD_PER = 1000  # Server-side cursor se ek baar mein itni rows. Memory isi se bounded rehti hai, total rows se nahi.
+ROWS_PER_CHUNK = 500  # Itni rows jama karke ek HTTP chunk, har row pe alag write ka overhead nahi.
+
+TICKET_COLUMNS = ["id", "user_id", "status", "assigned_admin_id", "created_at", "updated_at", "hold_reason", "description"]
+LOG_COLUMNS = ["id", "ticket_id", "old_status", "new_status", "changed_by_admin_id", "timestamp"]
+
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.value  # API jaisa hi "In Progress", enum name nahi.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _serialize(rows: Iterator, columns: List[str], fmt: str) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(columns)  # Header.
+    count = 0
+    for row in rows:
+        values = [_value(v) for v in row]
+        if writer is not None:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values)), separators=(",", ":")) + "\n")
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _stream(statement, columns: List[str], fmt: str) -> Iterator[str]:
+    # Sync generator: StreamingResponse ise threadpool mein iterate karta hai, event loop block nahi hota.
+    with read_session() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET LOCAL statement_timeout = 0"))  # Bada export DB_STATEMENT_TIMEOUT_MS se beech mein na kate.
+        # yield_per => stream_results: Postgres pe named (server-side) cursor, rows batch mein aati hain.
+        rows = db.execute(statement.execution_options(yield_per=YIELD_PER))
+        yield from _serialize(rows, columns, fmt)
+
+
+def ticket_export(fmt: str, status: Optional[List[TicketStatus]] = None,
+                  created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> Iterator[str]:
+    """Stream all matching tickets as CSV or NDJSON text chunks, ordered by id."""
+    statement = select(*[getattr(Ticket, col) for col in TICKET_COLUMNS]).order_by(Ticket.id)
+    if status:
+        statement = statement.where(Ticket.status.in_(status))
+    if created_from:
+        statement = statement.where(Ticket.created_at >= keyset_datetime(engine.dialect.name, created_from))
+    if created_to:
+        statement = statement.where(Ticket.created_at < keyset_datetime(engine.dialect.name, created_to))
+    return _stream(statement, TICKET_COLUMNS, fmt)
+
+
+def status_log_export(fmt: str, new_status: Optional[List[TicketStatus]] = None,
+                      changed_from: Optional[datetime] = None, changed_to: Optional[datetime] = None) -> Iterator[str]:
+    """Stream the status change audit log as CSV or NDJSON text chunks, ordered by id."""
+    statement = select(*[getattr(TicketStatusLog, col) for col in LOG_COLUMNS]).order_by(TicketStatusLog.id)
+    if new_status:
+        statement = statement.where(TicketStatusLog.new_status.in_(new_status))
+    if changed_from:
+        statement = statement.where(TicketStatusLog.timestamp >= keyset_datetime(engine.dialect.name, changed_from))
+    if changed_to:
+        statement = statement.where(TicketStatusLog.timestamp < keyset_datetime(engine.dialect.name, changed_to))
+    return _stream(statement, LOG_COLUMNS, fmt)
@@ -0,0 +1,215 @@
+import hashlib  # Upload ke saath-saath content hash (SHA-256) nikalne ke liye.
+import os  # Paths, atomic rename aur cleanup ke liye.
+import tempfile  # Unique temp file banane ke liye.
+import time  # Stale temp files pehchanne ke liye.
+from dataclasses import dataclass  # Staged upload ka metadata rakhne ke liye.
+from typing import Iterable, Optional  # Type hints.
+
+from sqlalchemy.orm import Session  # Blob references check karne ke liye.
+
+from fastapi import UploadFile  # Incoming multipart file.
+from fastapi.concurrency import run_in_threadpool  # Blocking disk I/O ko event loop se hatane ke liye.
+
+from app.core.config import settings  # Upload dir, size limit, chunk size.
+from app.core.metrics import observe_phase  # Disk write + hash time /metrics pe dikhane ke liye.
+from app.models.ticket import Attachment  # Blob ke references yahin se gine jaate hain.
+
+TEMP_DIR_NAME = ".tmp"  # Upload dir ke andar temp files yahan likhi jati hain. Same filesystem -> rename atomic.
+BLOB_DIR_NAME = "blobs"  # Content-addressed store: uploads/blobs/ab/cd/<sha256>.
+BLOB_GC_GRACE_SECONDS = 3600  # Itne naye blobs ko GC nahi chhedta, taaki in-flight dedup uploads ke saath race na ho.
+GC_SUFFIX = ".gc"  # GC delete se pehle blob ko is suffix pe rename karta hai (claim), references dobara check karke hi hatata hai.
+
+
+class UploadTooLarge(Exception):
+    """Raised while streaming when an upload crosses MAX_UPLOAD_SIZE_BYTES."""
+
+
+@dataclass
+class StagedFile:
+    """An upload fully written to a temp file, waiting to be promoted after the DB commit."""
+    filename: str  # User ka original (sanitized) file name.
+    content_type: Optional[str]  # MIME type.
+    temp_path: str  # Abhi kahan pada hai.
+    size: int  # Bytes.
+    sha256: str  # Hex digest, streaming ke dauraan hi calculate hua.
+    final_path: Optional[str] = None  # Commit ke baad kahan move hoga. Caller set karta hai.
+
+
+def temp_dir() -> str:
+    path = os.path.join(settings.UPLOAD_DIR, TEMP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    # Client ka filename "../../etc/passwd" jaisa bhi ho sakta hai. Sirf last component rakhte hain.
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    return name or "upload"
+
+
+def _write_chunk(buffer, hasher, chunk: bytes) -> None:
+    # Thread mein chalta hai: hashlib bade chunks pe GIL chhod deta hai, aur write blocking hai.
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _close_file(buffer) -> None:
+    buffer.flush()
+    os.fsync(buffer.fileno())  # Rename se pehle data disk pe ho, warna crash ke baad adhi file reh sakti hai.
+    buffer.close()
+
+
+async def stage_upload(upload: UploadFile) -> StagedFile:
+    """
+    Stream an UploadFile to a temp file in chunks, off the event loop.
+    Enforces MAX_UPLOAD_SIZE_BYTES while streaming and hashes the content as it goes.
+    The temp file is removed again if anything fails.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir(), prefix="upload-")
+    buffer = os.fdopen(fd, "wb")
+    hasher = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)  # Starlette khud ise threadpool mein padhta hai.
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE_BYTES:  # Poori file aane ka wait nahi, limit cross hote hi ruk jao.
+                raise UploadTooLarge(upload.filename)
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        await run_in_threadpool(_close_file, buffer)
+    except BaseException:
+        buffer.close()
+        _remove_quietly(temp_path)  # Adhi likhi temp file chhodni nahi.
+        raise
+    observe_phase("file_io", time.perf_counter() - started)
+
+    return StagedFile(
+        filename=safe_filename(upload.filename),
+        content_type=upload.content_type,
+        temp_path=temp_path,
+        size=size,
+        sha256=hasher.hexdigest(),
+    )
+
+
+def blob_root() -> str:
+    return os.path.join(settings.UPLOAD_DIR, BLOB_DIR_NAME)
+
+
+def blob_path(content_hash: str) -> str:
+    """
+    Sharded location of a blob: two levels of 256 directories from the hash prefix,
+    so no single directory grows past a few thousand entries.
+    """
+    return os.path.join(blob_root(), content_hash[:2], content_hash[2:4], content_hash)
+
+
+def promote(staged: StagedFile) -> None:
+    """
+    Move a staged file to its final path. Call only after the DB commit succeeded.
+    If the target already exists it holds the same content (the path is the content hash),
+    so the temp copy is dropped instead of stored twice.
+    """
+    os.makedirs(os.path.dirname(staged.final_path) or ".", exist_ok=True)
+    try:
+        # Dedup: same SHA-256 wala blob pehle se hai. mtime refresh kiya taaki GC grace period dobara shuru ho.
+        # exists() + utime() alag calls nahi: beech mein GC blob ko GC_SUFFIX pe rename kar sakta hai.
+        os.utime(staged.final_path)
+    except FileNotFoundError:
+        pass  # Blob nahi hai (ya GC ne abhi claim kiya): apni copy rakhte hain.
+    else:
+        _remove_quietly(staged.temp_path)
+        return
+    os.replace(staged.temp_path, staged.final_path)  # Same filesystem pe rename atomic hai: ya purani file ya poori nayi.
+
+
+def _referenced_hashes(db: Session, content_hashes) -> set:
+    """Which of these hashes at least one attachment row points at (index-backed IN query)."""
+    return {
+        row[0] for row in db.query(Attachment.content_hash).filter(Attachment.content_hash.in_(content_hashes)).distinct()
+    }
+
+
+def gc_orphan_blobs(db: Session, grace_seconds: int = BLOB_GC_GRACE_SECONDS) -> int:
+    """
+    Sweep the blob store and delete files no attachment references any more.
+    Blobs touched within `grace_seconds` are skipped. Returns how many were removed.
+    An orphan is first renamed aside and its references are checked again in a fresh transaction,
+    so an upload that dedups onto it concurrently never ends up pointing at a deleted blob.
+    """
+    root = blob_root()
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - grace_seconds
+    candidates = {}
+    claimed = {}  # Hash -> rename kiya hua path (GC_SUFFIX).
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name.endswith(GC_SUFFIX):
+                claimed[name[:-len(GC_SUFFIX)]] = path  # Pichla GC beech mein ruk gaya tha, wahin se aage.
+            elif os.stat(path).st_mtime < cutoff:
+                candidates[name] = path
+
+    hashes = list(candidates)
+    for start in range(0, len(hashes), 500):  # Batch mein IN query, har blob ke liye alag query nahi.
+        batch = hashes[start:start + 500]
+        referenced = _referenced_hashes(db, batch)
+        for content_hash in batch:
+            if content_hash in referenced:
+                continue
+            path = candidates[content_hash]
+            try:
+                if os.stat(path).st_mtime >= cutoff:  # Scan ke baad kisi dedup upload ne touch kiya.
+                    continue
+                os.replace(path, path + GC_SUFFIX)  # Claim: ab promote() ko ye path khali dikhega aur wo apni copy rakhega.
+            except FileNotFoundError:
+                continue
+            claimed[content_hash] = path + GC_SUFFIX
+
+    # promote() attachment row commit hone ke baad hi blob dekhta hai. Toh jis upload ne claim se pehle blob ko maujood
+    # paaya, uski row ab tak commit ho chuki hai. Naya snapshot lekar dobara check: wo row yahan dikhegi.
+    db.commit()
+    removed = 0
+    hashes = list(claimed)
+    for start in range(0, len(hashes), 500):
+        batch = hashes[start:start + 500]
+        referenced = _referenced_hashes(db, batch)
+        for content_hash in batch:
+            tombstone = claimed[content_hash]
+            if content_hash in referenced:
+                try:
+                    os.replace(tombstone, tombstone[:-len(GC_SUFFIX)])  # Beech mein reference aa gaya, blob wapas.
+                except FileNotFoundError:
+                    pass  # Koi aur GC pehle hi nipta chuka.
+            elif _remove_quietly(tombstone):
+                removed += 1
+    return removed
+
+
+def discard(staged_files: Iterable[StagedFile]) -> None:
+    """Delete temp files of uploads whose transaction did not commit."""
+    for staged in staged_files:
+        _remove_quietly(staged.temp_path)
+
+
+def cleanup_stale_temp_files(max_age_seconds: int = 3600) -> int:
+    """Remove temp files left behind by a crashed worker. Returns how many were removed."""
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    for entry in os.scandir(temp_dir()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:  # Purani file, koi request ab ise promote nahi karegi.
+            _remove_quietly(entry.path)
+            removed += 1
+    return removed
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,376 @@
+import asyncio  # Background refresh loop.
+import logging  # Background refresh failures.
+from bisect import bisect_left  # Duration ka histogram bucket.
+from datetime import date, datetime, timedelta, timezone  # Durations aur day buckets.
+from typing import Dict, List, Optional, Tuple  # Type hints.
+
+from fastapi.concurrency import run_in_threadpool  # Sync refresh ko event loop se hata ke chalana.
+from sqlalchemy import case, func, select, update  # Window functions, watermark claim aur bucket min/max merge.
+from sqlalchemy.exc import IntegrityError  # Pehli baar watermark row do refresh ek saath banayein.
+from sqlalchemy.orm import Session  # DB session type.
+
+from app.core.config import settings  # Refresh batch aur settle delay.
+from app.db.session import SessionLocal  # Background refresh apna session kholta hai.
+from app.models.enums import TicketStatus  # Status metrics.
+from app.models.ticket import RollupWatermark, Ticket, TicketLifecycleRollup, TicketStatusLog  # Source aur rollup tables.
+from app.utils.pagination import keyset_datetime  # SQLite pe datetime compare.
+
+logger = logging.getLogger("app.services.ticket_analytics")
+
+WATERMARK_NAME = "ticket_lifecycle"
+FIRST_RESPONSE = "first_response"  # Ticket banne se pehle status change tak.
+RESOLUTION = "resolution"  # Ticket banne se Resolved tak. Reopen hoke dobara resolve hua toh dobara ginta hai.
+NO_ADMIN = 0  # admin_key sentinel, ticket_counters jaisa.
+
+# Histogram bucket ki upper bounds (seconds): 1 min se 90 din tak. Aakhri bucket (len) iske upar ka sab.
+BUCKET_BOUNDS = [
+    60, 300, 900, 1800, 3600, 2 * 3600, 4 * 3600, 8 * 3600, 16 * 3600,
+    86400, 2 * 86400, 4 * 86400, 7 * 86400, 14 * 86400, 30 * 86400, 90 * 86400,
+]
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def in_status_metric(status: TicketStatus) -> str:
+    return f"in_status:{status.name}"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Postgres aware datetime deta hai, SQLite naive (UTC). Dono ko ek jaisa bana ke subtract.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _bucket(seconds: float) -> int:
+    return bisect_left(BUCKET_BOUNDS, seconds)
+
+
+# --- Incremental rollup ---
+
+def _lifecycle_rows(db: Session, after_id: int, upto_id: int):
+    """
+    Status logs in (after_id, upto_id] with the previous transition of the same ticket.
+    The window runs over each touched ticket's full history via ix_ticket_status_logs_ticket_id_timestamp_id,
+    so a new log still sees an older previous row that an earlier refresh already rolled up.
+    """
+    log = TicketStatusLog
+    window = {"partition_by": log.ticket_id, "order_by": (log.timestamp, log.id)}
+    touched = select(log.ticket_id).where(log.id > after_id, log.id <= upto_id).distinct()
+    history = (
+        select(
+            log.id, log.old_status, log.new_status, log.changed_by_admin_id, log.timestamp,
+            Ticket.created_at,
+            func.lag(log.timestamp, type_=log.timestamp.type).over(**window).label("previous_at"),
+            func.row_number().over(**window).label("seq"),
+        )
+        .join(Ticket, Ticket.id == log.ticket_id)
+        .where(log.ticket_id.in_(touched), log.id <= upto_id)
+        .subquery()
+    )
+    return db.execute(select(history).where(history.c.id > after_id))
+
+
+def _collect(rows) -> Dict[Tuple[date, str, int, int], List[float]]:
+    """Per (day, metric, admin_key, bucket): [count, total seconds, min seconds, max seconds]."""
+    totals: Dict[Tuple[date, str, int, int], List[float]] = {}
+
+    def add(day: date, metric: str, admin_key: int, seconds: float) -> None:
+        seconds = max(seconds, 0.0)  # Clock skew (app vs DB time) se negative na aaye.
+        entry = totals.setdefault((day, metric, admin_key, _bucket(seconds)), [0, 0.0, seconds, seconds])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = min(entry[2], seconds)
+        entry[3] = max(entry[3], seconds)
+
+    for row in rows:
+        if row.created_at is None or row.timestamp is None:
+            continue
+        at = _naive_utc(row.timestamp)
+        created_at = _naive_utc(row.created_at)
+        day = at.date()
+        admin_key = row.changed_by_admin_id or NO_ADMIN
+        # Pichla status kab shuru hua tha: pichla log, ya pehla log ho toh ticket creation.
+        started_at = _naive_utc(row.previous_at) if row.previous_at is not None else created_at
+        add(day, in_status_metric(row.old_status or TicketStatus.PENDING), NO_ADMIN, (at - started_at).total_seconds())
+        if row.seq == 1:
+            add(day, FIRST_RESPONSE, admin_key, (at - created_at).total_seconds())
+        if row.new_status == TicketStatus.RESOLVED:
+            add(day, RESOLUTION, admin_key, (at - created_at).total_seconds())
+    return totals
+
+
+def _lower(column, value):
+    # min/max ka portable CASE: existing NULL (migration se pehle ka row) ho toh comparison NULL, naya value jeet jata hai.
+    return case((column <= value, column), else_=value)
+
+
+def _higher(column, value):
+    return case((column >= value, column), else_=value)
+
+
+def _upsert(db: Session, totals: Dict[Tuple[date, str, int, int], List[float]]) -> None:
+    values = [
+        {"day": day, "metric": metric, "admin_key": admin_key, "bucket": bucket, "count": count,
+         "total_seconds": seconds, "min_seconds": low, "max_seconds": high}
+        for (day, metric, admin_key, bucket), (count, seconds, low, high) in totals.items()
+    ]
+    if not values:
+        return
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+
+    if insert is not None:
+        # Ek multi-row upsert: existing bucket mein count/seconds jod do.
+        stmt = insert(TicketLifecycleRollup).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TicketLifecycleRollup.day, TicketLifecycleRollup.metric,
+                            TicketLifecycleRollup.admin_key, TicketLifecycleRollup.bucket],
+            set_={
+                "count": TicketLifecycleRollup.count + stmt.excluded.count,
+                "total_seconds": TicketLifecycleRollup.total_seconds + stmt.excluded.total_seconds,
+                "min_seconds": _lower(TicketLifecycleRollup.min_seconds, stmt.excluded.min_seconds),
+                "max_seconds": _higher(TicketLifecycleRollup.max_seconds, stmt.excluded.max_seconds),
+            },
+        )
+        db.execute(stmt)
+        return
+
+    # Baaki databases ke liye UPDATE-then-INSERT fallback.
+    for row in values:
+        updated = (
+            db.query(TicketLifecycleRollup)
+            .filter(
+                TicketLifecycleRollup.day == row["day"],
+                TicketLifecycleRollup.metric == row["metric"],
+                TicketLifecycleRollup.admin_key == row["admin_key"],
+                TicketLifecycleRollup.bucket == row["bucket"],
+            )
+            .update({
+                TicketLifecycleRollup.count: TicketLifecycleRollup.count + row["count"],
+                TicketLifecycleRollup.total_seconds: TicketLifecycleRollup.total_seconds + row["total_seconds"],
+                TicketLifecycleRollup.min_seconds: _lower(TicketLifecycleRollup.min_seconds, row["min_seconds"]),
+                TicketLifecycleRollup.max_seconds: _higher(TicketLifecycleRollup.max_seconds, row["max_seconds"]),
+            }, synchronize_session=False)
+        )
+        if not updated:
+            db.add(TicketLifecycleRollup(**row))
+
+
+def refresh_rollups(db: Session, batch: Optional[int] = None) -> Dict:
+    """
+    Fold status logs added since the last refresh into `ticket_lifecycle_rollups` and commit.
+    At most `batch` logs (ANALYTICS_REFRESH_BATCH) per call; logs younger than ANALYTICS_SETTLE_SECONDS wait
+    for the next call. The watermark is claimed with a conditional UPDATE, so concurrent refreshes never
+    count the same log twice: the loser gets no row back, leaves the work to the winner and reports `contended`.
+    `caught_up` is true when there was nothing left to fold in.
+    """
+    batch = batch or settings.ANALYTICS_REFRESH_BATCH
+    watermark = db.get(RollupWatermark, WATERMARK_NAME)
+    if watermark is None:
+        watermark = RollupWatermark(name=WATERMARK_NAME, last_id=0)
+        db.add(watermark)
+        try:
+            db.flush()
+        except IntegrityError:  # Doosre worker ne abhi abhi bana di.
+            db.rollback()
+            return {"processed_through_log_id": 0, "buckets_touched": 0, "contended": True, "caught_up": False}
+    after_id = watermark.last_id
+
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=settings.ANALYTICS_SETTLE_SECONDS)
+    candidate_ids = (
+        select(TicketStatusLog.id)
+        .where(
+            TicketStatusLog.id > after_id,
+            TicketStatusLog.timestamp < keyset_datetime(db.get_bind().dialect.name, settled_before),
+        )
+        .order_by(TicketStatusLog.id)
+        .limit(batch)
+        .subquery()
+    )
+    upto_id = db.execute(select(func.max(candidate_ids.c.id))).scalar()
+    if upto_id is None:  # Kuch naya nahi.
+        db.commit()
+        return {"processed_through_log_id": after_id, "buckets_touched": 0, "contended": False, "caught_up": True}
+
+    claimed = db.execute(
+        update(RollupWatermark)
+        .where(RollupWatermark.name == WATERMARK_NAME, RollupWatermark.last_id == after_id)
+        .values(last_id=upto_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:  # Doosre refresh ne ye range le li. Caller ko pata chale ki ye call kuch process nahi kar paayi.
+        db.rollback()
+        return {"processed_through_log_id": after_id, "buckets_touched": 0, "contended": True, "caught_up": False}
+
+    totals = _collect(_lifecycle_rows(db, after_id, upto_id))
+    _upsert(db, totals)
+    db.commit()  # Watermark aur rollup ek hi transaction mein: ya dono, ya koi nahi.
+    return {"processed_through_log_id": upto_id, "buckets_touched": len(totals), "contended": False, "caught_up": False}
+
+
+def catch_up(db: Session) -> Dict:
+    """
+    Refresh batch after batch until every settled status log is in the rollup.
+    A batch lost to a concurrent refresh is retried from the advanced watermark, so the call only
+    returns once the rollup is caught up; `contended_batches` says how often that happened.
+    """
+    batches, contended = 0, 0
+    while True:
+        result = refresh_rollups(db)
+        if result["caught_up"]:
+            return {"processed_through_log_id": result["processed_through_log_id"], "batches": batches,
+                    "contended_batches": contended}
+        if result["contended"]:
+            contended += 1  # Winner ne watermark aage badhaya; wahan se dobara.
+        else:
+            batches += 1
+
+
+def rebuild_rollups(db: Session) -> Dict:
+    """Drop the rollups and recompute them from the whole status log, one committed batch at a time."""
+    db.query(TicketLifecycleRollup).delete(synchronize_session=False)
+    watermark = db.get(RollupWatermark, WATERMARK_NAME)
+    if watermark is not None:
+        watermark.last_id = 0
+    db.commit()
+    return catch_up(db)
+
+
+async def refresh_periodically(interval_seconds: float) -> None:
+    """Background loop: catch the rollup up every `interval_seconds`. Safe to run in every worker."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(_catch_up_in_own_session)
+        except Exception:  # Ek fail hua refresh loop band na kare; agli baar phir koshish.
+            logger.exception("lifecycle rollup refresh failed")
+
+
+def _catch_up_in_own_session() -> Dict:
+    with SessionLocal() as db:
+        return catch_up(db)
+
+
+# --- Reads ---
+
+def rollup_freshness(db: Session) -> Dict:
+    """
+    How far the rollup trails the status log: the last folded-in log id and the age of the oldest
+    log not in the rollup yet (0 when caught up). Two primary-key lookups.
+    """
+    last_id = db.query(RollupWatermark.last_id).filter(RollupWatermark.name == WATERMARK_NAME).scalar() or 0
+    oldest_pending = (
+        db.query(TicketStatusLog.timestamp).filter(TicketStatusLog.id > last_id).order_by(TicketStatusLog.id).limit(1).scalar()
+    )
+    lag = 0.0
+    if oldest_pending is not None:
+        lag = max((_naive_utc(datetime.now(timezone.utc)) - _naive_utc(oldest_pending)).total_seconds(), 0.0)
+    return {
+        "processed_through_log_id": last_id,
+        "oldest_pending_log_at": oldest_pending,
+        "rollup_lag_seconds": round(lag, 1),
+    }
+
+
+Histogram = Dict[int, Tuple[int, Optional[float], Optional[float]]]  # bucket -> (count, observed min, observed max).
+
+
+def _percentile(buckets: Histogram, total: int, fraction: float) -> float:
+    """
+    Linear interpolation inside the histogram bucket holding the requested rank, between the bucket's
+    observed min and max (its bounds when those are unknown), so it never exceeds the largest observed duration.
+    """
+    target = fraction * total
+    seen = 0
+    for bucket in sorted(buckets):
+        count, low, high = buckets[bucket]
+        if seen + count >= target:
+            lower = float(BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0)
+            upper = float(BUCKET_BOUNDS[bucket]) if bucket < len(BUCKET_BOUNDS) else None
+            lower = max(lower, low) if low is not None else lower
+            upper = high if high is not None else upper
+            if upper is None:  # Upar wala open bucket aur max pata nahi (purana row): lower bound hi report.
+                return lower
+            upper = max(upper, lower)
+            return lower + (upper - lower) * ((target - seen) / count)
+        seen += count
+    return float(BUCKET_BOUNDS[-1])
+
+
+def _summary(buckets: Histogram, total_seconds: float) -> Dict:
+    total = sum(count for count, _, _ in buckets.values())
+    if not total:
+        return {"count": 0, "mean_seconds": None, **{f"p{int(p * 100)}_seconds": None for p in PERCENTILES}}
+    return {
+        "count": total,
+        "mean_seconds": round(total_seconds / total, 1),
+        **{f"p{int(p * 100)}_seconds": round(_percentile(buckets, total, p), 1) for p in PERCENTILES},
+    }
+
+
+def _rollup_query(db: Session, columns, date_from: Optional[date], date_to: Optional[date]):
+    query = db.query(*columns)
+    if date_from:
+        query = query.filter(TicketLifecycleRollup.day >= date_from)
+    if date_to:
+        query = query.filter(TicketLifecycleRollup.day <= date_to)
+    return query
+
+
+def lifecycle_summary(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Dict:
+    """
+    Time to first response, resolution time and time spent in each status, with mean and percentiles.
+    Reads only the rollup (one GROUP BY over days x buckets); percentiles are exact to within one bucket and
+    never outside the observed min/max of that bucket.
+    """
+    rows = (
+        _rollup_query(db, (TicketLifecycleRollup.metric, TicketLifecycleRollup.bucket,
+                           func.sum(TicketLifecycleRollup.count), func.sum(TicketLifecycleRollup.total_seconds),
+                           func.min(TicketLifecycleRollup.min_seconds), func.max(TicketLifecycleRollup.max_seconds)),
+                      date_from, date_to)
+        .group_by(TicketLifecycleRollup.metric, TicketLifecycleRollup.bucket)
+        .all()
+    )
+    histograms: Dict[str, Histogram] = {}
+    seconds: Dict[str, float] = {}
+    for metric, bucket, count, total_seconds, low, high in rows:
+        histograms.setdefault(metric, {})[bucket] = (count or 0, low, high)
+        seconds[metric] = seconds.get(metric, 0.0) + (total_seconds or 0.0)
+
+    def summary(metric: str) -> Dict:
+        return _summary(histograms.get(metric, {}), seconds.get(metric, 0.0))
+
+    return {
+        "first_response": summary(FIRST_RESPONSE),
+        "resolution": summary(RESOLUTION),
+        "time_in_status": {status.value: summary(in_status_metric(status)) for status in TicketStatus},
+    }
+
+
+def admin_throughput(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[Dict]:
+    """Resolutions and first responses per admin, with mean resolution time, from the rollup."""
+    rows = (
+        _rollup_query(db, (TicketLifecycleRollup.admin_key, TicketLifecycleRollup.metric,
+                           func.sum(TicketLifecycleRollup.count), func.sum(TicketLifecycleRollup.total_seconds)),
+                      date_from, date_to)
+        .filter(TicketLifecycleRollup.metric.in_((FIRST_RESPONSE, RESOLUTION)),
+                TicketLifecycleRollup.admin_key != NO_ADMIN)
+        .group_by(TicketLifecycleRollup.admin_key, TicketLifecycleRollup.metric)
+        .all()
+    )
+    admins: Dict[int, Dict] = {}
+    for admin_key, metric, count, total_seconds in rows:
+        entry = admins.setdefault(admin_key, {
+            "admin_id": admin_key, "resolved": 0, "first_responses": 0, "mean_resolution_seconds": None,
+        })
+        if metric == RESOLUTION:
+            entry["resolved"] = count or 0
+            entry["mean_resolution_seconds"] = round((total_seconds or 0.0) / count, 1) if count else None
+        else:
+            entry["first_responses"] = count or 0
+    return sorted(admins.values(), key=lambda entry: (-entry["resolved"], entry["admin_id"]))
@@ -0,0 +1,79 @@
+from typing import List, Optional, Tuple  # Type hints.
+
+from sqlalchemy import Float, and_, cast, func, literal_column, tuple_  # Search expressions aur keyset comparison.
+from sqlalchemy.orm import Query, Session  # DB session type.
+
+from app.models.ticket import Ticket  # Searchable table.
+from app.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, keyset_datetime  # Keyset cursor helpers.
+
+SEARCH_CONFIG = "english"  # Migration ke generated column wala hi text search config. Alag hua toh GIN index use nahi hoga.
+MAX_LIKE_TERMS = 8  # LIKE fallback mein har term ek scan condition hai, isliye limit.
+
+# Generated column ORM mein map nahi kiya: SQLite pe exist nahi karta aur Postgres khud bharta hai.
+search_vector = literal_column("tickets.search_vector")
+
+
+def _escape_like(term: str) -> str:
+    # User ke `%` / `_` wildcards na banein, literal match hon.
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _postgres_search(db: Session, base: Query, q: str, cursor: Optional[str], limit: int) -> Tuple[List[Ticket], Optional[str]]:
+    # websearch_to_tsquery user input ko safely parse karta hai ("quoted phrase", -exclude, or) bina syntax errors ke.
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # ts_rank_cd `real` (float4) deta hai, par cursor ka rank float8 bind hota hai. float4 column ko widened float8 se compare
+    # karne pe boundary rank wale tie rows barabar nahi nikalte (skip/repeat). Isliye ek hi baar double precision mein cast,
+    # aur SELECT, ORDER BY aur keyset filter teeno isi expression pe.
+    rank = cast(func.ts_rank_cd(search_vector, ts_query), Float(53))
+    query = base.add_columns(rank.label("rank")).filter(search_vector.op("@@")(ts_query))  # `@@` GIN index se match hota hai.
+
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_rank, (int, float)) or not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        # Rank desc, id desc. Same rank wale tickets id se tie-break, taaki pages overlap ya skip na karein.
+        query = query.filter(tuple_(rank, Ticket.id) < tuple_(float(last_rank), last_id))
+
+    rows = query.order_by(rank.desc(), Ticket.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_ticket, last_rank = rows[-1]
+        next_cursor = encode_cursor(float(last_rank), last_ticket.id)
+    return [ticket for ticket, _ in rows], next_cursor
+
+
+def _like_search(db: Session, base: Query, q: str, cursor: Optional[str], limit: int) -> Tuple[List[Ticket], Optional[str]]:
+    # Local/SQLite fallback: har word description mein hona chahiye (AND), case-insensitive. Ranking nahi, newest first.
+    terms = q.split()[:MAX_LIKE_TERMS]
+    description = func.lower(Ticket.description)
+    query = base.filter(and_(*[description.like(f"%{_escape_like(term.lower())}%", escape="\\") for term in terms]))
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, 2)
+        last_created_at = parse_cursor_datetime(last_created_at)
+        if not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        dialect_name = db.get_bind().dialect.name
+        query = query.filter(
+            tuple_(Ticket.created_at, Ticket.id) < tuple_(keyset_datetime(dialect_name, last_created_at), last_id)
+        )
+
+    tickets = query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = encode_cursor(tickets[-1].created_at, tickets[-1].id)
+    return tickets, next_cursor
+
+
+def search_tickets(db: Session, base: Query, q: str, cursor: Optional[str], limit: int) -> Tuple[List[Ticket], Optional[str]]:
+    """
+    Search ticket descriptions, returning one keyset page and the cursor for the next one.
+    Postgres: ranked full-text match on the GIN-indexed `search_vector`.
+    Other databases: AND of case-insensitive LIKE terms, newest first.
+    `base` carries the caller's access scoping and eager loads. Raises ValueError on a bad cursor.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return _postgres_search(db, base, q, cursor, limit)
+    return _like_search(db, base, q, cursor, limit)
@@ -0,0 +1,184 @@
+import random  # Counter shard choose karne ke liye.
+from typing import Dict, List, Optional, Tuple  # Type hints.
+
+from sqlalchemy import case, func  # Conditional aggregation ke liye.
+from sqlalchemy.orm import Session  # DB session type.
+
+from app.core.config import settings  # Counters on/off aur shard count.
+from app.models.enums import TicketStatus  # Status buckets.
+from app.models.ticket import Ticket, TicketCounter  # Source table aur materialized counters.
+
+UNASSIGNED_KEY = 0  # TicketCounter.admin_key mein unassigned tickets ka sentinel.
+
+
+def _empty_stats() -> Dict:
+    return {"total": 0, "pending": 0, "in_progress": 0, "on_hold": 0, "resolved": 0, "workload": []}
+
+
+def _status_key(status: TicketStatus) -> str:
+    # Response keys purane format jaise: "pending", "in_progress", "on_hold", "resolved".
+    return status.name.lower()
+
+
+def aggregate_stats(db: Session) -> Dict:
+    """
+    Dashboard stats from a single conditional-aggregation query over `tickets`.
+    Grouped by assignee so the same scan also yields the per-admin workload.
+    """
+    # Pehle 4 COUNT(*) + 1 GROUP BY = 5 scans the. Ab ek hi GROUP BY mein har status ka SUM(CASE ...) nikal rahe hain.
+    status_columns = [
+        func.sum(case((Ticket.status == status, 1), else_=0)).label(_status_key(status))
+        for status in TicketStatus
+    ]
+    rows = (
+        db.query(Ticket.assigned_admin_id, func.count(Ticket.id).label("total"), *status_columns)
+        .group_by(Ticket.assigned_admin_id)
+        .all()
+    )
+
+    stats = _empty_stats()
+    for row in rows:  # Groups sirf (admins + 1) hote hain, Python mein jodna sasta hai.
+        stats["total"] += row.total
+        for status in TicketStatus:
+            stats[_status_key(status)] += getattr(row, _status_key(status)) or 0
+        stats["workload"].append({"admin_id": row.assigned_admin_id, "count": row.total})
+    return stats
+
+
+def counter_stats(db: Session) -> Dict:
+    """Dashboard stats read from `ticket_counters`; cost depends on admin count, not ticket count."""
+    rows = (
+        db.query(TicketCounter.admin_key, TicketCounter.status, func.sum(TicketCounter.count))
+        .group_by(TicketCounter.admin_key, TicketCounter.status)
+        .all()
+    )
+
+    stats = _empty_stats()
+    workload: Dict[Optional[int], int] = {}
+    for admin_key, status, count in rows:
+        count = count or 0
+        admin_id = None if admin_key == UNASSIGNED_KEY else admin_key
+        stats["total"] += count
+        stats[_status_key(status)] += count
+        workload[admin_id] = workload.get(admin_id, 0) + count
+    stats["workload"] = [{"admin_id": admin_id, "count": count} for admin_id, count in workload.items() if count]
+    return stats
+
+
+def get_dashboard_stats(db: Session) -> Dict:
+    """Stats from the counters table when enabled, otherwise from one aggregate query."""
+    if settings.TICKET_COUNTERS_ENABLED:
+        return counter_stats(db)
+    return aggregate_stats(db)
+
+
+def _admin_key(admin_id: Optional[int]) -> int:
+    return UNASSIGNED_KEY if admin_id is None else admin_id
+
+
+def _bump(db: Session, admin_id: Optional[int], status: TicketStatus, delta: int) -> None:
+    # Random shard pe +delta/-delta. Sab shards ka sum hi asli count hai, isliye kisi bhi shard pe likhna sahi hai.
+    values = {
+        "admin_key": _admin_key(admin_id),
+        "status": status,
+        "shard": random.randrange(max(settings.TICKET_COUNTER_SHARDS, 1)),
+        "count": delta,
+    }
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+
+    if insert is not None:
+        # Upsert: row nahi hai toh banao, hai toh atomically count += delta. Read-modify-write race nahi hoga.
+        stmt = insert(TicketCounter).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TicketCounter.admin_key, TicketCounter.status, TicketCounter.shard],
+            set_={"count": TicketCounter.count + stmt.excluded.count},
+        )
+        db.execute(stmt)
+        return
+
+    # Baaki databases ke liye simple UPDATE-then-INSERT fallback.
+    updated = (
+        db.query(TicketCounter)
+        .filter(
+            TicketCounter.admin_key == values["admin_key"],
+            TicketCounter.status == status,
+            TicketCounter.shard == values["shard"],
+        )
+        .update({TicketCounter.count: TicketCounter.count + delta}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(TicketCounter(**values))
+
+
+def record_ticket_change(
+    db: Session,
+    old_status: Optional[TicketStatus],
+    old_admin_id: Optional[int],
+    new_status: TicketStatus,
+    new_admin_id: Optional[int],
+) -> None:
+    """
+    Move one ticket between counter buckets inside the caller's transaction.
+    Pass old_status=None for a newly created ticket. No-op while counters are disabled.
+    """
+    if not settings.TICKET_COUNTERS_ENABLED:
+        return
+    if old_status == new_status and old_admin_id == new_admin_id:  # Kuch badla hi nahi.
+        return
+    if old_status is not None:
+        _bump(db, old_admin_id, old_status, -1)  # Purane bucket se nikala.
+    _bump(db, new_admin_id, new_status, 1)  # Naye bucket mein daala.
+
+
+def record_ticket_changes(
+    db: Session,
+    changes: List[Tuple[Optional[TicketStatus], Optional[int], TicketStatus, Optional[int]]],
+) -> None:
+    """
+    Batch form of `record_ticket_change` for set-based updates: deltas are summed per bucket
+    first, so N moved tickets cost one upsert per distinct bucket instead of 2N.
+    """
+    if not settings.TICKET_COUNTERS_ENABLED:
+        return
+    deltas: Dict[Tuple[Optional[int], TicketStatus], int] = {}
+    for old_status, old_admin_id, new_status, new_admin_id in changes:
+        if old_status == new_status and old_admin_id == new_admin_id:
+            continue
+        if old_status is not None:
+            deltas[(old_admin_id, old_status)] = deltas.get((old_admin_id, old_status), 0) - 1
+        deltas[(new_admin_id, new_status)] = deltas.get((new_admin_id, new_status), 0) + 1
+    for (admin_id, status), delta in deltas.items():
+        if delta:  # Ek bucket se nikle aur wapas aaye toh net zero, likhne ki zaroorat nahi.
+            _bump(db, admin_id, status, delta)
+
+
+def record_ticket_created(db: Session, ticket: Ticket) -> None:
+    """Count a freshly inserted ticket."""
+    record_ticket_change(db, None, None, ticket.status, ticket.assigned_admin_id)
+
+
+def rebuild_counters(db: Session) -> List[Dict]:
+    """
+    Recompute `ticket_counters` from `tickets` in one GROUP BY. Run once after enabling
+    counters, or to repair drift, ideally while ticket writes are quiet. Caller commits.
+    """
+    rows = (
+        db.query(Ticket.assigned_admin_id, Ticket.status, func.count(Ticket.id))
+        .group_by(Ticket.assigned_admin_id, Ticket.status)
+        .all()
+    )
+    db.query(TicketCounter).delete(synchronize_session=False)  # Purane (shayad drift wale) counters saaf.
+    buckets = [
+        {"admin_key": _admin_key(admin_id), "status": status, "shard": 0, "count": count}
+        for admin_id, status, count in rows
+        if status is not None
+    ]
+    if buckets:
+        db.bulk_insert_mappings(TicketCounter, buckets)  # Ek batch insert.
+    return buckets
@@ -0,0 +1,57 @@
+import base64  # Cursor ko URL-safe string banane ke liye.
+import json  # Cursor values serialize karne ke liye.
+from datetime import datetime, timezone  # Timestamps ko cursor mein encode/decode karne ke liye.
+from typing import Any, List  # Type hints.
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Build an opaque keyset cursor from the sort key of the last row on a page.
+    Datetimes are stored as ISO strings, everything else must be JSON serializable.
+    """
+    # Datetime JSON mein directly nahi jata, isliye ISO string bana rahe hain. Baaki values (id, rank) as-is.
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")  # Compact JSON taaki cursor chhota rahe.
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")  # Padding hata di, query string mein clean dikhega.
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Raises ValueError if the cursor is malformed or has the wrong number of parts.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)  # Jo padding encode ke waqt hataya tha wapas laga rahe hain.
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:  # Client ne cursor ke saath chhed-chhaad ki ya galat string bheji.
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:  # Shape check, warna query mein galat values chali jayengi.
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    """Turn the ISO string stored in a cursor back into a datetime."""
+    if not isinstance(value, str):
+        raise ValueError("Invalid cursor")
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_datetime(dialect_name: str, value: datetime) -> Any:
+    """
+    Bind value for comparing a cursor timestamp against a DateTime column.
+    SQLite stores server_default timestamps as 'YYYY-MM-DD HH:MM:SS' text, while a
+    bound datetime is rendered with microseconds, so ties would compare unequal.
+    """
+    if dialect_name != "sqlite":  # Postgres mein timestamptz proper type hai, datetime direct bind ho jata hai.
+        return value
+    from sqlalchemy import literal  # Sirf SQLite path pe chahiye.
+    if value.tzinfo is not None:  # SQLite CURRENT_TIMESTAMP UTC mein naive text hai, client ka offset wala time UTC mein la rahe hain.
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    text_value = value.strftime("%Y-%m-%d %H:%M:%S")  # CURRENT_TIMESTAMP wala same format.
+    if value.microsecond:  # Python side se set hue timestamps mein microseconds hote hain.
+        text_value += f".{value.microsecond:06d}"
+    return literal(text_value)  # String literal taaki SQLite text comparison exact rahe.
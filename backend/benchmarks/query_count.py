@@ -0,0 +1,124 @@
+"""
+N+1 guard for ticket list and detail.
+
+Seeds a small database, calls the list endpoint with different page sizes and the detail endpoint, and
+counts the SELECTs that load ticket rows, attachments and status logs. Exits 1 unless every call issues
+exactly TICKET_SELECTS of them and the list endpoint's statement count does not grow with the page size.
+
+    python benchmarks/query_count.py
+
+Run from the backend directory.
+"""
+import argparse  # CLI flags.
+import asyncio  # In-process ASGI client.
+import os  # Env setup before importing the app.
+import re  # Loader statement detection.
+import sys  # Exit code.
+from typing import Dict, List, Optional  # Type hints.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # `benchmarks.*` aur `app.*` imports.
+
+from benchmarks.run import Lifespan, login, prepare_environment, seed_database  # Same setup as the benchmark runner.
+
+TICKET_SELECTS = 3  # ticket rows + attachments (ek IN query) + status logs (ek IN query), page size kuch bhi ho.
+# Full-row loads hi pakadte hain: ye columns sirf entity SELECT mein aate hain, page keys / fingerprint / head query mein nahi.
+LOADER = re.compile(r"\b(tickets\.description|attachments\.file_path|ticket_status_logs\.old_status)\b")
+PAGE_SIZES = (1, 20, 100)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fail when ticket list/detail loads relationships per row.")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file in a temp dir. Postgres must already be migrated and empty.")
+    return parser.parse_args(argv)
+
+
+class StatementCounter:
+    """Engine listener that collects SELECT statements while `active` is set."""
+
+    def __init__(self):
+        self.active = False
+        self.statements: List[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append(statement)
+
+    def loader_selects(self) -> int:
+        return sum(1 for statement in self.statements if LOADER.search(statement))
+
+
+async def measure(client, counter: StatementCounter, path: str, headers: Dict, params: Optional[Dict] = None) -> Dict:
+    await client.get(path, params=params, headers=headers)  # Warm-up: principal cache bhar jaye, auth lookup count mein na aaye.
+    counter.statements = []
+    counter.active = True
+    response = await client.get(path, params=params, headers=headers)
+    counter.active = False
+    items = response.json().get("items") if response.status_code == 200 and path.endswith("/") else None
+    return {
+        "status_code": response.status_code,
+        "items": len(items) if items is not None else 1,
+        "statements": len(counter.statements),
+        "ticket_selects": counter.loader_selects(),
+    }
+
+
+async def run_checks(counter: StatementCounter) -> List[Dict]:
+    import httpx
+    from app.main import app
+    from benchmarks.seed import SEED_PASSWORD
+
+    results = []
+    async with Lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://queries", timeout=60) as client:
+            admin = await login(client, "bench-admin-0@example.com", SEED_PASSWORD)
+            user = await login(client, "bench-user-0@example.com", SEED_PASSWORD)
+            for limit in PAGE_SIZES:
+                results.append({"name": f"list admin limit={limit}",
+                                **await measure(client, counter, "/api/v1/tickets/", admin, {"limit": limit})})
+            results.append({"name": "list user limit=100",
+                            **await measure(client, counter, "/api/v1/tickets/", user, {"limit": 100})})
+            own = (await client.get("/api/v1/tickets/", params={"limit": 1}, headers=user)).json()["items"]
+            # User ka apna ticket: admin ke Pending ticket kholne pe auto-open hota, wo alag (write) path hai.
+            results.append({"name": "detail user",
+                            **await measure(client, counter, f"/api/v1/tickets/{own[0]['id']}", user)})
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    prepare_environment(args)
+    os.environ["ASYNC_DB"] = "false"  # Listener sync engine pe.
+    os.environ.pop("DATABASE_REPLICA_URLS", None)  # Sab statements ek hi engine pe.
+    seed_database(args)
+
+    from sqlalchemy import event
+    from app.db.session import engine
+
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        results = asyncio.run(run_checks(counter))
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    failures = []
+    for result in results:
+        ok = result["status_code"] == 200 and result["ticket_selects"] == TICKET_SELECTS
+        failures += [] if ok else [result["name"]]
+        print(f"{result['name']:<22} {result['items']:>4} items  {result['statements']:>2} statements  "
+              f"{result['ticket_selects']} ticket SELECTs  {'OK' if ok else 'FAIL'}")
+    list_counts = {result["statements"] for result in results if result["name"].startswith("list admin")}
+    if len(list_counts) > 1:  # Page size ke saath statements badhe matlab kahin per-row query hai.
+        failures.append("list statements grow with page size")
+        print(f"list statement counts differ by page size: {sorted(list_counts)}")
+
+    print(f"\nFAILED: {', '.join(failures)}" if failures else f"\nAll calls issued {TICKET_SELECTS} ticket SELECTs.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+API benchmark runner.
+
+Seeds a database, drives the real FastAPI app through the main flows and reports
+p50/p95/p99 latency, throughput and SQL statements per request (read from /metrics).
+
+    python benchmarks/run.py                                  # in-process ASGI, temp SQLite
+    python benchmarks/run.py --mode uvicorn --concurrency 20  # real server over HTTP
+    python benchmarks/run.py --save benchmarks/baselines/local.json
+    python benchmarks/run.py --compare benchmarks/baselines/local.json
+
+Run from the backend directory. App settings (BCRYPT_ROUNDS, ASYNC_DB, ...) come from the environment as usual.
+"""
+import argparse  # CLI flags.
+import asyncio  # Concurrent requests.
+import json  # Baseline files.
+import os  # Env setup before importing the app.
+import platform  # Baseline metadata.
+import random  # Request mix.
+import re  # /metrics parsing.
+import socket  # Free port for uvicorn.
+import subprocess  # uvicorn server process.
+import sys  # sys.path aur exit code.
+import tempfile  # Scratch database + uploads.
+import time  # Latency measurement.
+from datetime import datetime, timezone  # Baseline timestamp.
+from typing import Dict, List, Optional  # Type hints.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("login", "create_ticket", "list_tickets", "read_ticket", "dashboard_stats")
+# Labels mein route template ke `{ticket_id}` jaise braces hote hain, isliye label block greedy match.
+METRIC_LINE = re.compile(r'^(http_request_db_queries|http_request_duration_seconds)_(sum|count)\{(.*)\} ([0-9.eE+-]+)$')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ticket API.")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--database-url", help="Defaults to a fresh SQLite file in a temp dir. Postgres must already be migrated.")
+    parser.add_argument("--skip-seed", action="store_true", help="Database is already seeded by an earlier run.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--save", help="Write results as a JSON baseline to this path.")
+    parser.add_argument("--compare", help="Baseline JSON to diff against; exits 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95/throughput drift.")
+    return parser.parse_args(argv)
+
+
+# --- Environment / app setup ---
+
+def prepare_environment(args) -> str:
+    """Point the app at the benchmark database and upload dir. Must run before any `app` import."""
+    workdir = tempfile.mkdtemp(prefix="ticket-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["METRICS_ENABLED"] = "true"  # Query counts /metrics se aate hain.
+    os.environ.setdefault("ANALYTICS_REFRESH_INTERVAL_SECONDS", "0")  # Background rollup refresh measurements ke beech na chale.
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return workdir
+
+
+def seed_database(args) -> Dict[str, int]:
+    from app.db.session import Base, SessionLocal, engine
+    import app.models  # noqa: F401  (saare tables register)
+    from benchmarks.seed import seed
+
+    if engine.dialect.name == "sqlite":  # SQLite pe migrations ki jagah create_all. Postgres pehle se `alembic upgrade head` hona chahiye.
+        Base.metadata.create_all(engine)
+    os.makedirs(os.environ["UPLOAD_DIR"], exist_ok=True)
+    db = SessionLocal()
+    try:
+        return seed(db, users=args.users, admins=args.admins, tickets=args.tickets)
+    finally:
+        db.close()
+
+
+class Lifespan:
+    """Drive the ASGI lifespan protocol so startup/shutdown hooks run for the in-process client."""
+
+    def __init__(self, app):
+        self.app = app
+        self.to_app: asyncio.Queue = asyncio.Queue()
+        self.from_app: asyncio.Queue = asyncio.Queue()
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, self.to_app.get, self.from_app.put))
+        await self.to_app.put({"type": "lifespan.startup"})
+        message = await self.from_app.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"App startup failed: {message}")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.to_app.put({"type": "lifespan.shutdown"})
+        await self.from_app.get()
+        await self.task
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(client, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not come up in time")
+
+
+# --- Measurement ---
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100.0 * len(sorted_values))) - 1, 0)  # Nearest-rank.
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def scrape_totals(client) -> Dict[str, float]:
+    """Sum of SQL statements and requests recorded by /metrics across all routes except /metrics itself."""
+    totals = {"queries": 0.0, "requests": 0.0}
+    text = (await client.get("/metrics")).text
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if not match or 'route="/metrics"' in match.group(3):
+            continue
+        name, kind, _, value = match.groups()
+        if name == "http_request_db_queries" and kind == "sum":
+            totals["queries"] += float(value)
+        elif name == "http_request_duration_seconds" and kind == "count":
+            totals["requests"] += float(value)
+    return totals
+
+
+async def run_scenario(client, name: str, make_request, total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:  # Shared iterator: har worker agla slot uthata hai, total fixed rehta hai.
+            started = time.perf_counter()
+            response = await make_request(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    before = await scrape_totals(client)
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    after = await scrape_totals(client)
+
+    latencies.sort()
+    served = after["requests"] - before["requests"]
+    return {
+        "requests": total,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round((after["queries"] - before["queries"]) / served, 2) if served else None,
+    }
+
+
+# --- Scenarios ---
+
+async def login(client, email: str, password: str) -> Dict[str, str]:
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def build_scenarios(client, args) -> Dict:
+    from benchmarks.seed import SEED_PASSWORD
+
+    rng = random.Random(7)
+    user_emails = [f"bench-user-{i}@example.com" for i in range(args.users)]
+    user_headers = [await login(client, email, SEED_PASSWORD) for email in user_emails[:10]]
+    admin_headers = await login(client, "bench-admin-0@example.com", SEED_PASSWORD)  # SENIOR admin.
+    first_page = (await client.get("/api/v1/tickets/", params={"limit": 100}, headers=admin_headers)).json()["items"]
+    ticket_ids = [ticket["id"] for ticket in first_page] or [1]
+    upload = b"x" * 16 * 1024  # 16 KB attachment.
+
+    return {
+        "login": lambda c: c.post("/api/v1/auth/login", data={"username": rng.choice(user_emails), "password": SEED_PASSWORD}),
+        "create_ticket": lambda c: c.post(
+            "/api/v1/tickets/", headers=rng.choice(user_headers),
+            data={"description": "Benchmark created ticket"}, files=[("files", ("bench.bin", upload, "application/octet-stream"))],
+        ),
+        "list_tickets": lambda c: c.get("/api/v1/tickets/", params={"limit": 50}, headers=admin_headers),
+        "read_ticket": lambda c: c.get(f"/api/v1/tickets/{rng.choice(ticket_ids)}", headers=admin_headers),
+        "dashboard_stats": lambda c: c.get("/api/v1/admins/dashboard/stats", headers=admin_headers),
+    }
+
+
+async def run_all(args) -> Dict[str, Dict]:
+    import httpx
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    async def drive(client):
+        scenarios = await build_scenarios(client, args)
+        results = {}
+        for name in selected:
+            results[name] = await run_scenario(client, name, scenarios[name], args.requests, args.concurrency)
+            print(format_row(name, results[name]), flush=True)
+        return results
+
+    if args.mode == "inprocess":
+        from app.main import app
+        async with Lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                return await drive(client)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            await wait_for_server(client)
+            return await drive(client)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+# --- Reporting ---
+
+def format_row(name: str, result: Dict) -> str:
+    queries = "-" if result["queries_per_request"] is None else f"{result['queries_per_request']:.2f}"
+    return (
+        f"{name:<16} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+        f"{result['throughput_rps']:>8.1f} req/s  {queries:>6} q/req  errors {result['errors']}"
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(baseline: Dict, results: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regression messages for scenarios that got slower, lost throughput or issue more SQL than the baseline."""
+    problems = []
+    for name, current in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if base["throughput_rps"] and current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {base['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if base.get("queries_per_request") is not None and current["queries_per_request"] is not None \
+                and current["queries_per_request"] > base["queries_per_request"] + 0.5:  # Query count noise-free hai, tolerance nahi.
+            problems.append(f"{name}: queries/request {base['queries_per_request']} -> {current['queries_per_request']}")
+        if current["errors"] > base.get("errors", 0):
+            problems.append(f"{name}: errors {base.get('errors', 0)} -> {current['errors']}")
+    return problems
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    prepare_environment(args)
+    if not args.skip_seed:
+        counts = seed_database(args)
+        print("seeded " + ", ".join(f"{key}={value}" for key, value in counts.items()), flush=True)
+
+    results = asyncio.run(run_all(args))
+    report = {
+        "meta": {
+            "mode": args.mode,
+            "database": os.environ["DATABASE_URL"].split("://", 1)[0],
+            "async_db": os.environ.get("ASYNC_DB", "false"),
+            "users": args.users, "admins": args.admins, "tickets": args.tickets,
+            "requests_per_scenario": args.requests, "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "git_commit": git_commit(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as handle:
+            problems = compare(json.load(handle), results, args.tolerance)
+        if problems:
+            print("REGRESSIONS:\n  " + "\n  ".join(problems))
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
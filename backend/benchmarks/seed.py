@@ -0,0 +1,97 @@
+import hashlib  # Seed blob ka content hash.
+import os  # Blob file likhne ke liye.
+import random  # Deterministic (seeded) data distribution.
+from datetime import datetime, timedelta, timezone  # Ticket timestamps spread karne ke liye.
+from typing import Dict, List  # Type hints.
+
+from sqlalchemy import insert  # Batched multi-row inserts.
+from sqlalchemy.orm import Session  # DB session type.
+
+from app.core import security  # Ek hi bcrypt hash sab seed accounts ke liye.
+from app.models.enums import AdminRole, TicketStatus  # Roles aur statuses.
+from app.models.ticket import Attachment, Ticket, TicketStatusLog  # Seed tables.
+from app.models.user import Admin, User  # Seed accounts.
+from app.services import file_service  # Content-addressed blob path.
+
+SEED_PASSWORD = "bench-password"  # Saare seed users/admins ka password. Benchmark login isi se hota hai.
+BATCH_SIZE = 1000  # Ek INSERT mein itni rows.
+SEED_BLOB = b"benchmark attachment\n" * 64  # Saare seed attachments ek hi blob share karte hain (dedup store jaisa).
+
+
+def _batched_insert(db: Session, model, rows: List[Dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(db: Session, users: int, admins: int, tickets: int, attachments_per_ticket: float = 0.5,
+         logs_per_ticket: float = 1.0, random_seed: int = 42) -> Dict[str, int]:
+    """
+    Fill an empty database with benchmark data in a few batched inserts.
+    Accounts are `bench-user-{i}@example.com` / `bench-admin-{i}@example.com` with SEED_PASSWORD.
+    The first admin is SENIOR, the rest alternate SUB/JUNIOR. Returns row counts.
+    """
+    rng = random.Random(random_seed)  # Same seed = same data, runs compare ho sakein.
+    hashed = security.get_password_hash(SEED_PASSWORD)  # bcrypt ek hi baar; har row pe hash karna seeding ko minutes le jata.
+
+    admin_rows = [
+        {
+            "email": f"bench-admin-{i}@example.com",
+            "hashed_password": hashed,
+            "full_name": f"Bench Admin {i}",
+            "role": AdminRole.SENIOR if i == 0 else (AdminRole.SUB if i % 2 else AdminRole.JUNIOR),
+            "is_active": True,
+        }
+        for i in range(admins)
+    ]
+    user_rows = [
+        {"email": f"bench-user-{i}@example.com", "hashed_password": hashed, "full_name": f"Bench User {i}", "is_active": True}
+        for i in range(users)
+    ]
+    _batched_insert(db, Admin, admin_rows)
+    _batched_insert(db, User, user_rows)
+    admin_ids = [row[0] for row in db.query(Admin.id).filter(Admin.email.like("bench-admin-%")).all()]
+    user_ids = [row[0] for row in db.query(User.id).filter(User.email.like("bench-user-%")).all()]
+
+    # Tickets pichle 90 din mein spread, taaki date filters aur keyset pages realistic hon.
+    now = datetime.now(timezone.utc)
+    statuses = list(TicketStatus)
+    ticket_rows = []
+    for i in range(tickets):
+        status = rng.choice(statuses)
+        ticket_rows.append({
+            "user_id": rng.choice(user_ids),
+            "description": f"Benchmark ticket {i}: printer vpn laptop issue #{rng.randrange(1000)}",
+            "status": status,
+            "created_at": now - timedelta(seconds=rng.randrange(90 * 24 * 3600)),
+            "assigned_admin_id": None if status == TicketStatus.PENDING else rng.choice(admin_ids),
+            "hold_reason": "Waiting for user" if status == TicketStatus.ON_HOLD else None,
+        })
+    _batched_insert(db, Ticket, ticket_rows)
+    ticket_ids = [row[0] for row in db.query(Ticket.id).order_by(Ticket.id).all()][-tickets:] if tickets else []
+
+    content_hash = hashlib.sha256(SEED_BLOB).hexdigest()
+    blob = file_service.blob_path(content_hash)
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    with open(blob, "wb") as handle:
+        handle.write(SEED_BLOB)
+
+    attachment_rows, log_rows = [], []
+    for ticket_id, row in zip(ticket_ids, ticket_rows):
+        for _ in range(int(attachments_per_ticket) + (rng.random() < attachments_per_ticket % 1)):
+            attachment_rows.append({
+                "ticket_id": ticket_id, "filename": "seed.txt", "file_path": blob, "file_type": "text/plain",
+                "content_hash": content_hash, "size_bytes": len(SEED_BLOB),
+            })
+        if row["status"] != TicketStatus.PENDING:
+            for _ in range(int(logs_per_ticket) + (rng.random() < logs_per_ticket % 1)):
+                log_rows.append({
+                    "ticket_id": ticket_id, "old_status": TicketStatus.PENDING, "new_status": row["status"],
+                    "changed_by_admin_id": row["assigned_admin_id"],
+                })
+    _batched_insert(db, Attachment, attachment_rows)
+    _batched_insert(db, TicketStatusLog, log_rows)
+    db.commit()
+    return {
+        "users": len(user_rows), "admins": len(admin_rows), "tickets": len(ticket_rows),
+        "attachments": len(attachment_rows), "status_logs": len(log_rows),
+    }
@@ -0,0 +1,309 @@
+"""
+Bulk import of users, tickets and status logs from CSV or JSONL.
+
+    python bulk_import.py --users users.csv --tickets tickets.jsonl --status-logs logs.csv
+    python bulk_import.py --tickets tickets.csv --batch-size 20000 --hash-workers 8
+
+Columns (extra columns are ignored):
+    users:       email, full_name, password | hashed_password, is_active, created_at, id
+    tickets:     user_id | user_email, description, status, created_at, updated_at, assigned_admin_id, hold_reason, id
+    status_logs: ticket_id, old_status, new_status, changed_by_admin_id, timestamp, id
+
+Postgres is loaded with COPY, other databases with batched executemany. Every batch commits
+together with its checkpoint row, so an interrupted import resumes exactly where it stopped
+when re-run with the same files. Use --restart to ignore old checkpoints.
+"""
+import argparse  # CLI flags.
+import csv  # CSV input aur COPY buffer.
+import io  # COPY ke liye in-memory CSV buffer.
+import json  # JSONL input.
+import os  # File paths / checkpoint keys.
+import sys  # Exit code.
+import time  # Progress rate.
+from concurrent.futures import ProcessPoolExecutor  # bcrypt CPU-bound hai, processes mein parallel.
+from datetime import datetime, timezone  # Timestamp parsing.
+from typing import Dict, Iterator, List, Optional  # Type hints.
+
+from sqlalchemy import BigInteger, Column, MetaData, String, Table, insert, select, text  # Core inserts aur checkpoint table.
+
+from app.core import security  # Password hashing.
+from app.core.config import settings  # Counters on hain toh rebuild.
+from app.db.session import SessionLocal, engine  # Import connection.
+from app.models.enums import TicketStatus  # Status parsing.
+from app.models.ticket import Ticket, TicketStatusLog  # Target tables.
+from app.models.user import User  # Target table.
+from app.services import ticket_stats  # Import ke baad counters rebuild.
+
+# Checkpoint table app ke models ka hissa nahi hai, sirf import tool ka bookkeeping. Pehli run pe khud ban jati hai.
+checkpoint_metadata = MetaData()
+checkpoints = Table(
+    "bulk_import_checkpoints", checkpoint_metadata,
+    Column("source", String(512), primary_key=True),  # kind + file path + size.
+    Column("rows_done", BigInteger, nullable=False),
+)
+
+# --- Input ---
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """Stream dict rows from a .csv or .jsonl/.ndjson file without loading it into memory."""
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8") as handle:
+            yield from csv.DictReader(handle)
+
+
+def batches(rows: Iterator[Dict], size: int, skip: int) -> Iterator[List[Dict]]:
+    for _ in range(skip):  # Resume: pehle se commit hui rows sirf padh ke chhod do, DB pe kuch nahi jata.
+        if next(rows, None) is None:
+            return
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+def _int(value) -> Optional[int]:
+    return None if _blank(value) else int(value)
+
+
+def _bool(value, default: bool = True) -> bool:
+    if _blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "t", "yes", "y")
+
+
+def _datetime(value) -> Optional[datetime]:
+    return None if _blank(value) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _status(value) -> Optional[TicketStatus]:
+    # "PENDING" (name) aur "Pending" (value) dono chalte hain.
+    if _blank(value):
+        return None
+    value = str(value).strip()
+    if value in TicketStatus.__members__:
+        return TicketStatus[value]
+    return TicketStatus(value)
+
+
+# --- Row conversion ---
+
+def convert_users(batch: List[Dict], pool: Optional[ProcessPoolExecutor]) -> List[Dict]:
+    plain = [row.get("password") for row in batch if _blank(row.get("hashed_password"))]
+    if any(_blank(p) for p in plain):
+        raise ValueError("Every user row needs password or hashed_password")
+    now = datetime.now(timezone.utc)  # Timestamp missing ho toh import time. NULL kabhi nahi, listing/keyset created_at pe chalti hai.
+    # bcrypt jaan-boojh kar slow hai; lakhon rows ke liye saare CPU cores pe baant rahe hain.
+    hashed = iter(pool.map(security.get_password_hash, plain, chunksize=64) if pool else map(security.get_password_hash, plain))
+    out = []
+    for row in batch:
+        out.append({
+            "id": _int(row.get("id")),
+            "email": row["email"].strip(),
+            "hashed_password": row["hashed_password"] if not _blank(row.get("hashed_password")) else next(hashed),
+            "full_name": None if _blank(row.get("full_name")) else row["full_name"],
+            "is_active": _bool(row.get("is_active")),
+            "created_at": _datetime(row.get("created_at")) or now,
+        })
+    return out
+
+
+def convert_tickets(batch: List[Dict], connection) -> List[Dict]:
+    # user_email diya hai toh batch ke saare emails ek IN query se resolve.
+    emails = {row["user_email"].strip() for row in batch if _blank(row.get("user_id")) and not _blank(row.get("user_email"))}
+    user_ids = {}
+    if emails:
+        user_ids = dict(connection.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+    now = datetime.now(timezone.utc)
+    out = []
+    for row in batch:
+        user_id = _int(row.get("user_id"))
+        if user_id is None:
+            user_id = user_ids.get((row.get("user_email") or "").strip())
+            if user_id is None:
+                raise ValueError(f"Unknown user for ticket row: {row}")
+        out.append({
+            "id": _int(row.get("id")),
+            "user_id": user_id,
+            "description": row["description"],
+            "status": _status(row.get("status")) or TicketStatus.PENDING,
+            "created_at": _datetime(row.get("created_at")) or now,
+            "updated_at": _datetime(row.get("updated_at")),
+            "assigned_admin_id": _int(row.get("assigned_admin_id")),
+            "hold_reason": None if _blank(row.get("hold_reason")) else row["hold_reason"],
+        })
+    return out
+
+
+def convert_logs(batch: List[Dict], connection) -> List[Dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": _int(row.get("id")),
+            "ticket_id": int(row["ticket_id"]),
+            "old_status": _status(row.get("old_status")),
+            "new_status": _status(row["new_status"]),
+            "changed_by_admin_id": _int(row.get("changed_by_admin_id")),
+            "timestamp": _datetime(row.get("timestamp")) or now,
+        }
+        for row in batch
+    ]
+
+
+# --- Writers ---
+
+def _columns_present(rows: List[Dict], columns: List[str]) -> List[str]:
+    # Jo optional column (id, updated_at...) poore batch mein khali hai use chhod do, taaki DB default/sequence lage.
+    # `id` diya hai toh file ki har row mein dena hoga, mixed batch mein NULL id insert fail hoga.
+    return [col for col in columns if any(row[col] is not None for row in rows)]
+
+
+def _copy_value(value):
+    if value is None:
+        return None  # csv.writer ise khali unquoted field likhta hai, COPY csv mein wahi NULL hai.
+    if isinstance(value, TicketStatus):
+        return value.name  # Postgres enum type names store karta hai.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_batch(cursor, table: str, columns: List[str], rows: List[Dict]) -> None:
+    """COPY one batch into Postgres through psycopg2 (`copy_expert`) or psycopg 3 (`copy`)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[col]) for col in columns])
+    quoted = ", ".join(f'"{col}"' for col in columns)  # `timestamp` jaise column naam keywords bhi hain.
+    sql = f"COPY {table} ({quoted}) FROM STDIN WITH (FORMAT csv)"
+    buffer.seek(0)
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def write_batch(table, rows: List[Dict], source: str, rows_done: int) -> None:
+    """Insert one batch and advance its checkpoint in the same transaction."""
+    columns = _columns_present(rows, [c.name for c in table.columns if c.name in rows[0]])
+    if engine.dialect.name == "postgresql":
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            copy_batch(cursor, table.name, columns, rows)
+            cursor.execute(
+                "INSERT INTO bulk_import_checkpoints (source, rows_done) VALUES (%s, %s) "
+                "ON CONFLICT (source) DO UPDATE SET rows_done = EXCLUDED.rows_done",
+                (source, rows_done),
+            )
+            raw.commit()
+        except BaseException:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+        return
+
+    # SQLite / baaki: executemany (ek prepared INSERT, saari rows ek call mein).
+    with engine.begin() as connection:
+        connection.execute(insert(table), [{col: row[col] for col in columns} for row in rows])
+        updated = connection.execute(
+            checkpoints.update().where(checkpoints.c.source == source).values(rows_done=rows_done)
+        ).rowcount
+        if not updated:
+            connection.execute(checkpoints.insert().values(source=source, rows_done=rows_done))
+
+
+def checkpoint_key(kind: str, path: str) -> str:
+    # Same file (path + size) dobara chalao toh resume; file badal gayi toh naya import.
+    return f"{kind}:{os.path.abspath(path)}:{os.path.getsize(path)}"
+
+
+def import_file(kind: str, path: str, args, pool: Optional[ProcessPoolExecutor]) -> int:
+    table = {"users": User.__table__, "tickets": Ticket.__table__, "status_logs": TicketStatusLog.__table__}[kind]
+    source = checkpoint_key(kind, path)
+    with engine.begin() as connection:
+        if args.restart:
+            connection.execute(checkpoints.delete().where(checkpoints.c.source == source))
+        done = connection.execute(select(checkpoints.c.rows_done).where(checkpoints.c.source == source)).scalar() or 0
+    if done:
+        print(f"{kind}: resuming {path} after {done} rows")
+
+    started, imported = time.monotonic(), 0
+    for batch in batches(read_rows(path), args.batch_size, done):
+        if kind == "users":
+            rows = convert_users(batch, pool)
+        else:
+            with engine.connect() as connection:
+                rows = (convert_tickets if kind == "tickets" else convert_logs)(batch, connection)
+        done += len(rows)
+        imported += len(rows)
+        write_batch(table, rows, source, done)
+        rate = imported / max(time.monotonic() - started, 1e-6)
+        print(f"{kind}: {done} rows ({rate:,.0f} rows/s)", flush=True)
+    return imported
+
+
+def reset_sequences() -> None:
+    # Explicit ids ke saath import ke baad Postgres sequences peeche reh jaate hain; app ke agle INSERT pe duplicate key aayega.
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for table in ("users", "tickets", "ticket_status_logs"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            ))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users, tickets and status logs (CSV or JSONL).")
+    parser.add_argument("--users", help="Users file.")
+    parser.add_argument("--tickets", help="Tickets file (after users, if it references user_email).")
+    parser.add_argument("--status-logs", help="Status logs file (after tickets).")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per COPY / executemany and per checkpoint.")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1, help="Processes for bcrypt. 1 = no pool.")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing checkpoints for these files.")
+    args = parser.parse_args(argv)
+    if not (args.users or args.tickets or args.status_logs):
+        parser.error("nothing to import")
+
+    checkpoint_metadata.create_all(engine)  # Checkpoint table (agar nahi hai).
+    pool = ProcessPoolExecutor(max_workers=args.hash_workers) if args.users and args.hash_workers > 1 else None
+    try:
+        # Order zaroori hai: tickets users ko aur logs tickets ko refer karte hain.
+        for kind, path in (("users", args.users), ("tickets", args.tickets), ("status_logs", args.status_logs)):
+            if path:
+                print(f"{kind}: imported {import_file(kind, path, args, pool)} rows from {path}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    reset_sequences()
+    if settings.TICKET_COUNTERS_ENABLED and (args.tickets or args.status_logs):
+        db = SessionLocal()
+        try:
+            ticket_stats.rebuild_counters(db)  # Import ne counters bypass kiye, dashboard ke liye dobara gino.
+            db.commit()
+        finally:
+            db.close()
+    print("Done.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
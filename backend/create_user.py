@@ -1,6 +1,7 @@
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.core import security
+from app.core.config import settings
 
 def create_test_user():
     db = SessionLocal()
@@ -29,7 +30,8 @@ def create_test_user():
             print("User created.")
             
         db.commit()
-        print("Done.")
+        # Server ka principal cache alag process mein hai; wahan is_active TTL ke andar refresh hoga.
+        print(f"Done. Running API workers pick this up within PRINCIPAL_CACHE_TTL_SECONDS ({settings.PRINCIPAL_CACHE_TTL_SECONDS}s).")
     except Exception as e:
         print(f"Error: {e}")
         db.rollback()
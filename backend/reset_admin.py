@@ -1,5 +1,6 @@
 from app.db.session import SessionLocal  # Hum database session import kar rahe hain taaki DB operations perform kar sakein. Direct connection inefficient hota hai isliye session pool use kiya.
 from app.models.user import Admin  # Admin model import kiya taaki Admin table pe query ya insert kar sakein. Raw SQL queries likhne se better hai ORM use karna for safety and readability.
+from app.core.config import settings  # Principal cache TTL message ke liye.
 from app.core import security  # Security module import kiya password hashing maintain karne ke liye. Plain text password store karna secure nahi hota.
 from app.models.enums import AdminRole  # AdminRole enum use kar rahe hain taaki role values consistent rahein (jaise 'SENIOR'). Hardcoded strings use karne se typo errors ho sakte hain.
 
@@ -34,7 +35,9 @@ def reset_super_admin():  # Ye function super admin create ya reset karne ke liy
             print("Admin created.")  # Confirmation message.
             
         db.commit()  # Transaction commit kar rahe hain taaki changes permanent ho jayein. Bina commit ke data save nahi hoga.
-        print("Done.")  # Final success message.
+        # Server ka principal cache is script ke process mein nahi hai, isliye yahan se invalidate kuch nahi karta.
+        # Chalte hue API workers naya role/is_active zyada se zyada PRINCIPAL_CACHE_TTL_SECONDS mein dekh lenge.
+        print(f"Done. Running API workers pick this up within PRINCIPAL_CACHE_TTL_SECONDS ({settings.PRINCIPAL_CACHE_TTL_SECONDS}s).")  # Final success message.
     except Exception as e:  # Koi bhi error aane pe pakad rahe hain. Generic Exception catch karna yahan theek hai kyunki ye script hai, main app mein specific exceptions catch karte hain.
         print(f"Error: {e}")  # Error detail print kar rahe hain debugging ke liye.
         db.rollback()  # Error aane pe transaction rollback kar rahe hain taaki partial/corrupt data save na ho pure database consistency ke liye.